@@ -0,0 +1,205 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import cifra_cesar_robusta
+import cifra_vernam_modular_ascii
+import cifravernam_otp
+import vernam_cifrar_decifrar
+from carregar_cifras import carregar_vernam_xor
+
+cifra_vernam_xor = carregar_vernam_xor()
+
+# --- Benchmark das Cifras ---
+
+# Tamanhos usados por padrão (rápidos) e na varredura completa (1 KB até 1 GB)
+TAMANHOS_PADRAO = "1K,64K,1M"
+TAMANHOS_COMPLETOS = "1K,16K,256K,4M,64M,1G"
+
+# Caracteres usados para montar cada corpus de teste
+CORPORA = {
+    'ascii': "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ" + " " * 8 + ".,",
+    'portugues': "abcdefghilmnoprstuvãõáéíóúâêôçàÁÉÇÃ" + " " * 6 + ".,",
+    'nao_alfabeto': "abcXYZ" + " \t\n#@$%&*_+=/<>[]{}|~^\"'" + "ñüß€",
+}
+
+# Padrão base repetido para formar textos grandes (evita sortear 1 GB caractere por caractere)
+TAMANHO_PADRAO_CORPUS = 64 * 1024
+
+def ler_tamanho(texto):
+    """Converte '1K', '4M', '1G' (ou um número) em quantidade de bytes."""
+    multiplicadores = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+    texto = texto.strip().upper()
+    if texto[-1:] in multiplicadores:
+        return int(texto[:-1]) * multiplicadores[texto[-1]]
+    return int(texto)
+
+def gerar_corpus(nome, tamanho, semente=0):
+    """Monta um texto de aproximadamente 'tamanho' bytes (UTF-8) a partir do corpus 'nome'."""
+    sorteio = random.Random(semente)
+    caracteres = CORPORA[nome]
+    padrao = "".join(sorteio.choice(caracteres) for _ in range(min(tamanho, TAMANHO_PADRAO_CORPUS)))
+    # Caracteres acentuados ocupam 2 bytes: ajusta o número de caracteres pelo tamanho em bytes
+    caracteres_por_byte = len(padrao) / len(padrao.encode('utf-8'))
+    total = int(tamanho * caracteres_por_byte)
+    return (padrao * (total // len(padrao) + 1))[:total]
+
+# --- Motores medidos ---
+# Cada preparação recebe o texto, gera a chave e devolve (função sem argumentos, dados de entrada).
+
+def preparar_processa(texto):
+    return lambda: cifra_cesar_robusta.processa(texto, 3), texto
+
+def preparar_processamento(texto):
+    chave = cifravernam_otp.gerar_chave(sum(1 for c in texto if c in cifravernam_otp.indice_alfabeto))
+    return lambda: cifravernam_otp.processamento(texto, chave, mode='cripto'), texto
+
+def preparar_vernam_cipher(texto):
+    chave = vernam_cifrar_decifrar.gerar_chave_otp(sum(map(str.isalpha, texto)))
+    return lambda: vernam_cifrar_decifrar.vernam_cipher(texto, chave, modo='cifrar'), texto
+
+def preparar_vernam_modular_completo(texto):
+    chave = cifra_vernam_modular_ascii.gerar_chave_otp_alfabetica(sum(map(str.isalpha, texto)))
+    return lambda: cifra_vernam_modular_ascii.vernam_modular_completo(texto, chave, modo='criptografia'), texto
+
+def preparar_vernam_cipher_xor(texto):
+    dados = texto.encode('utf-8')
+    chave = cifra_vernam_xor.gerar_chave_otp(len(dados))
+    return lambda: cifra_vernam_xor.vernam_cipher_xor(dados, chave), dados
+
+MOTORES = {
+    'processa': preparar_processa,
+    'processamento': preparar_processamento,
+    'vernam_cipher': preparar_vernam_cipher,
+    'vernam_modular_completo': preparar_vernam_modular_completo,
+    'vernam_cipher_xor': preparar_vernam_cipher_xor,
+}
+
+def medir(preparar, texto, repeticoes):
+    """
+    Mede um motor sobre um texto.
+
+    :return: Dicionário com MB/s (melhor de 'repeticoes'), pico de memória da
+             cifragem (tracemalloc, em uma execução separada) e tempo de geração da chave.
+    """
+    inicio = time.perf_counter()
+    executar, dados = preparar(texto)
+    tempo_chave = time.perf_counter() - inicio
+    tamanho = len(dados.encode('utf-8')) if isinstance(dados, str) else len(dados)
+
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        executar()
+        melhor = min(melhor, time.perf_counter() - inicio)
+
+    # O tracemalloc deixa a execução mais lenta, por isso roda fora da medição de tempo
+    tracemalloc.start()
+    try:
+        executar()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'bytes': tamanho,
+        'segundos': melhor,
+        'mb_s': tamanho / (1 << 20) / melhor if melhor > 0 else None,
+        'pico_memoria_bytes': pico,
+        'geracao_chave_s': tempo_chave,
+    }
+
+def executar_benchmark(motores, corpora, tamanhos, repeticoes=3):
+    """Executa todas as combinações motor x corpus x tamanho e devolve a lista de resultados."""
+    resultados = []
+    for tamanho in tamanhos:
+        for corpus in corpora:
+            texto = gerar_corpus(corpus, tamanho)
+            for motor in motores:
+                resultado = {'motor': motor, 'corpus': corpus, 'tamanho': tamanho}
+                try:
+                    resultado.update(medir(MOTORES[motor], texto, repeticoes))
+                except (ValueError, MemoryError) as e:
+                    # Ex.: vernam_modular_completo não aceita letras acentuadas
+                    resultado['erro'] = f"{type(e).__name__}: {e}"
+                resultados.append(resultado)
+                print(formatar_resultado(resultado), file=sys.stderr)
+    return resultados
+
+def formatar_resultado(resultado):
+    """Uma linha legível com o resultado de uma medição."""
+    rotulo = f"{resultado['motor']:<24} {resultado['corpus']:<13} {resultado['tamanho']:>11} B"
+    if 'erro' in resultado:
+        return f"{rotulo}  ERRO ({resultado['erro']})"
+    return (f"{rotulo}  {resultado['mb_s']:10.2f} MB/s  pico {resultado['pico_memoria_bytes'] / (1 << 20):9.2f} MB"
+            f"  chave {resultado['geracao_chave_s'] * 1000:9.2f} ms")
+
+def comparar(anterior, atual, tolerancia):
+    """
+    Compara duas execuções e devolve as medições cujo MB/s caiu mais que 'tolerancia'
+    (fração, ex.: 0.1 = 10%) ou que passaram a falhar.
+    """
+    chave = lambda r: (r['motor'], r['corpus'], r['tamanho'])
+    base = {chave(r): r for r in anterior['resultados']}
+    regressoes = []
+    for resultado in atual['resultados']:
+        antigo = base.get(chave(resultado))
+        if antigo is None or not antigo.get('mb_s'):
+            continue
+        if 'erro' in resultado:
+            regressoes.append((resultado, antigo, None))
+        elif resultado['mb_s'] < antigo['mb_s'] * (1 - tolerancia):
+            regressoes.append((resultado, antigo, resultado['mb_s'] / antigo['mb_s'] - 1))
+    return regressoes
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark de vazão das cifras (sem entrada do usuário).")
+    parser.add_argument('--motores', default=",".join(MOTORES), help="Lista separada por vírgulas.")
+    parser.add_argument('--corpora', default=",".join(CORPORA), help="Lista separada por vírgulas.")
+    parser.add_argument('--tamanhos', default=TAMANHOS_PADRAO, help="Ex.: 1K,64K,1M,1G.")
+    parser.add_argument('--completo', action='store_true', help=f"Usa os tamanhos {TAMANHOS_COMPLETOS}.")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--saida', default='benchmark_resultados.json', help="Arquivo JSON com os resultados.")
+    parser.add_argument('--comparar', help="JSON de uma execução anterior para detectar regressões.")
+    parser.add_argument('--tolerancia', type=float, default=0.10, help="Queda de MB/s tolerada (fração).")
+    opcoes = parser.parse_args(argumentos)
+
+    motores = opcoes.motores.split(",")
+    corpora = opcoes.corpora.split(",")
+    for nome in motores:
+        if nome not in MOTORES:
+            parser.error(f"Motor desconhecido: {nome}")
+    for nome in corpora:
+        if nome not in CORPORA:
+            parser.error(f"Corpus desconhecido: {nome}")
+    tamanhos = [ler_tamanho(t) for t in (TAMANHOS_COMPLETOS if opcoes.completo else opcoes.tamanhos).split(",")]
+
+    atual = {
+        'ambiente': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'numpy': getattr(cifra_vernam_xor.np, '__version__', None),
+        },
+        'resultados': executar_benchmark(motores, corpora, tamanhos, opcoes.repeticoes),
+    }
+
+    with open(opcoes.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(atual, arquivo, indent=2, ensure_ascii=False)
+    print(f"Resultados gravados em {opcoes.saida}", file=sys.stderr)
+
+    if opcoes.comparar:
+        with open(opcoes.comparar, encoding='utf-8') as arquivo:
+            anterior = json.load(arquivo)
+        regressoes = comparar(anterior, atual, opcoes.tolerancia)
+        for resultado, antigo, variacao in regressoes:
+            situacao = "agora falha" if variacao is None else f"{variacao:+.1%} MB/s"
+            print(f"REGRESSÃO: {resultado['motor']} {resultado['corpus']} {resultado['tamanho']} B: {situacao}")
+        return 1 if regressoes else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
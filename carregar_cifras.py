@@ -0,0 +1,34 @@
+import importlib.util
+import os
+import sys
+
+# --- Carregamento dos Scripts de Cifra como Módulos ---
+
+# Pasta onde ficam os scripts das cifras
+PASTA_CIFRAS = os.path.dirname(os.path.abspath(__file__))
+
+def carregar_script(nome_arquivo, nome_modulo=None):
+    """
+    Carrega um script da pasta das cifras como módulo, pelo caminho do arquivo.
+
+    Necessário para scripts cujo nome não é um identificador Python válido,
+    como 'cifra_vernam(otp).py'. O módulo fica registrado em sys.modules,
+    então carregar o mesmo script de novo devolve o mesmo objeto.
+    """
+    nome_modulo = nome_modulo or os.path.splitext(nome_arquivo)[0].replace('(', '_').replace(')', '')
+    if nome_modulo in sys.modules:
+        return sys.modules[nome_modulo]
+
+    especificacao = importlib.util.spec_from_file_location(nome_modulo, os.path.join(PASTA_CIFRAS, nome_arquivo))
+    modulo = importlib.util.module_from_spec(especificacao)
+    sys.modules[nome_modulo] = modulo
+    try:
+        especificacao.loader.exec_module(modulo)
+    except BaseException:
+        del sys.modules[nome_modulo]
+        raise
+    return modulo
+
+def carregar_vernam_xor():
+    """Carrega 'cifra_vernam(otp).py' (Vernam com XOR sobre bytes)."""
+    return carregar_script('cifra_vernam(otp).py', 'cifra_vernam_otp_xor')
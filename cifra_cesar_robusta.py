@@ -1,5 +1,8 @@
+import functools
 import string 
 
+import instrumentacao
+
 # --- Cifra de César ---
 
 # O Alfabeto (letras, dígitos, alguns símbolos e acentos) que serão cifrados.
@@ -22,6 +25,18 @@ def num_letra(i):
 
 # --- Algoritmo Central de Processamento ---
 
+@functools.lru_cache(maxsize=128)
+def tabela_traducao(deslocamento, modo):
+    """
+    Monta (uma única vez por par chave/modo) a tabela de 'str.translate' da cifra.
+    
+    Com a chave fixa, a cifra de César é só um mapeamento estático de caracteres:
+    cada P do alfabeto vai para num_letra(P + K). As tabelas ficam num cache LRU
+    limitado, indexado por (chave mod N, modo).
+    """
+    K = deslocamento if modo == 'criptografia' else -deslocamento
+    return str.maketrans(alfabeto, "".join(num_letra(P + K) for P in range(N)))
+
 def processa(texto, chave, modo='criptografia'):
     """Executa a cifragem ou decifragem, aceitando chaves de qualquer tamanho."""
     
@@ -29,24 +44,34 @@ def processa(texto, chave, modo='criptografia'):
     if modo not in ('criptografia', 'descriptografia'):
         raise ValueError("modo deve ser 'criptografia' ou 'descriptografia'")
     
-    # Define o Fator de Deslocamento (K).
-    # Se decifrando, K é negativo. Usar a chave bruta (sem módulo ) garante 
-    # que a decifragem funcione com a lógica de módulo em 'num_letra'.
-    K = chave if modo == 'criptografia' else -chave
+    # Chaves congruentes módulo N produzem a mesma tabela, então a chave bruta
+    # é reduzida antes de consultar o cache. Caracteres fora do alfabeto
+    # (ex: espaço, :) não estão na tabela e são mantidos por 'translate'.
+    if not instrumentacao.ATIVA:
+        return texto.translate(tabela_traducao(chave % N, modo))
+
+    inicio = instrumentacao.relogio()
+    tabela = tabela_traducao(chave % N, modo)
+    fim_tabela = instrumentacao.relogio()
+    resultado = texto.translate(tabela)
+    instrumentacao.registrar_tempo('processa.tabela', fim_tabela - inicio)
+    instrumentacao.registrar_tempo('processa.traducao', instrumentacao.relogio() - fim_tabela)
+    instrumentacao.contar('processa.caracteres', len(texto))
+    instrumentacao.contar('processa.ignorados', sum(1 for c in texto if ord(c) not in tabela))
+    return resultado
+
+def processa_lote(textos, chave, modo='criptografia'):
+    """
+    Cifra ou decifra vários textos com a mesma chave, reaproveitando a tabela.
+    
+    Aceita qualquer iterável (lista, gerador, arquivo) e devolve um gerador,
+    então lotes grandes não precisam caber inteiros na memória.
+    """
+    if modo not in ('criptografia', 'descriptografia'):
+        raise ValueError("modo deve ser 'criptografia' ou 'descriptografia'")
     
-    resultado = []
-    for c in texto:
-        if c in alfabeto:
-            # 1. Obtém a posição P.
-            P = letra_num(c)
-            # 2. Aplica o deslocamento: C = P + K.
-            # 3. Converte para o caractere final (usando módulo N).
-            resultado.append(num_letra(P + K))
-        else:
-            # Mantém qualquer caractere que não esteja no alfabeto (ex: espaço, :)
-            resultado.append(c)
-            
-    return "".join(resultado)
+    tabela = tabela_traducao(chave % N, modo)
+    return (texto.translate(tabela) for texto in textos)
 
 # --- Interface do Usuário ---
 
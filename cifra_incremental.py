@@ -0,0 +1,182 @@
+import abc
+import collections
+
+import cifra_vernam_modular_ascii
+import cifravernam_otp
+import vernam_cifrar_decifrar
+
+# --- Cifras Incrementais (texto e chave em partes) ---
+
+class CifraIncremental(abc.ABC):
+    """
+    Base das cifras incrementais: texto e chave chegam em partes, por 'update()',
+    e o resultado sai assim que cada caractere tem a sua letra de chave.
+
+    Guarda entre as chamadas apenas o trecho do texto que ainda espera chave e as
+    letras de chave ainda não usadas, além da posição na chave. 'finalize()' verifica
+    a regra do OTP: texto e chave com o mesmo número de caracteres válidos.
+
+    As subclasses definem 'eh_valido' (quais caracteres são cifrados e consomem
+    chave), 'transformar' (cifra de um caractere) e 'mensagem_erro'; uma subclasse
+    sem 'eh_valido' ou 'transformar' nem pode ser instanciada.
+    """
+
+    mensagem_erro = "O número de caracteres válidos no texto e na chave deve ser idêntico."
+
+    def __init__(self, modo):
+        self.modo = modo
+        # Partes pendentes em filas, com a posição de leitura na primeira parte:
+        # cada update só percorre o que chegou ou o que passou a ter chave, sem
+        # recopiar o acúmulo quando um dos lados está muito à frente do outro
+        self._textos = collections.deque()
+        self._inicio_texto = 0
+        self._chaves = collections.deque() # Só caracteres válidos
+        self._inicio_chave = 0
+        self.posicao_chave = 0 # Quantas letras da chave já foram usadas
+        self.finalizado = False
+
+    @property
+    def texto_pendente(self):
+        """Trecho do texto que ainda espera chave."""
+        return "".join(self._textos)[self._inicio_texto:]
+
+    @property
+    def chave_pendente(self):
+        """Caracteres válidos da chave ainda não usados."""
+        return "".join(self._chaves)[self._inicio_chave:]
+
+    @abc.abstractmethod
+    def eh_valido(self, caracter):
+        """Se o caractere é cifrado (e consome uma letra da chave)."""
+
+    @abc.abstractmethod
+    def transformar(self, caracter_texto, caracter_chave):
+        """Cifra (ou decifra) um caractere válido com a sua letra de chave."""
+
+    def update(self, texto="", chave=""):
+        """
+        Recebe mais uma parte do texto e/ou da chave e devolve o resultado que já
+        pode ser calculado. Caracteres que ainda não têm chave ficam pendentes.
+        """
+        if self.finalizado:
+            raise ValueError("A cifra já foi finalizada.")
+
+        eh_valido = self.eh_valido
+        transformar = self.transformar
+        textos = self._textos
+        chaves = self._chaves
+        if chave:
+            validos = "".join(filter(eh_valido, chave))
+            if validos:
+                chaves.append(validos)
+        if texto:
+            textos.append(texto)
+
+        resultado = []
+        usadas = 0
+        chave_atual = chaves[0] if chaves else ""
+        j = self._inicio_chave
+        falta_chave = False
+        while textos and not falta_chave:
+            parte = textos[0]
+            i = self._inicio_texto
+            while i < len(parte):
+                caracter = parte[i]
+                if eh_valido(caracter):
+                    if j == len(chave_atual):
+                        if len(chaves) < 2:
+                            # Falta chave: o resto do texto espera a próxima parte
+                            falta_chave = True
+                            break
+                        chaves.popleft()
+                        chave_atual = chaves[0]
+                        j = 0
+                    resultado.append(transformar(caracter, chave_atual[j]))
+                    j += 1
+                    usadas += 1
+                else:
+                    resultado.append(caracter)
+                i += 1
+            if falta_chave:
+                self._inicio_texto = i
+            else:
+                textos.popleft()
+                self._inicio_texto = 0
+
+        if chaves and j == len(chaves[0]):
+            chaves.popleft()
+            j = 0
+        self._inicio_chave = j
+        self.posicao_chave += usadas
+        return "".join(resultado)
+
+    def finalize(self):
+        """
+        Encerra o fluxo. Devolve a saída restante (sempre vazia quando o fluxo é válido).
+
+        :raises ValueError: Se sobrou texto sem chave ou chave sem texto.
+        """
+        if self.finalizado:
+            raise ValueError("A cifra já foi finalizada.")
+        self.finalizado = True
+        if self._textos or self._chaves:
+            raise ValueError(self.mensagem_erro)
+        return ""
+
+class ProcessamentoIncremental(CifraIncremental):
+    """Versão incremental de 'processamento' (cifravernam_otp.py), alfabeto estendido mod N."""
+
+    mensagem_erro = (f"ERRO: A chave deve ter o mesmo número de caracteres válidos "
+                     f"({cifravernam_otp.alfabeto_tamanho}) que o texto.")
+
+    def __init__(self, mode='cripto'):
+        super().__init__(mode)
+        self.tabela = cifravernam_otp.tabela_cripto if mode == 'cripto' else cifravernam_otp.tabela_decifrar
+
+    eh_valido = staticmethod(cifravernam_otp.indice_alfabeto.__contains__)
+
+    def transformar(self, caracter_texto, caracter_chave):
+        indice_alfabeto = cifravernam_otp.indice_alfabeto
+        return self.tabela[indice_alfabeto[caracter_chave]][indice_alfabeto[caracter_texto]]
+
+class VernamIncremental(CifraIncremental):
+    """Versão incremental de 'vernam_cipher' (vernam_cifrar_decifrar.py), letras mod 26."""
+
+    mensagem_erro = "ERRO: O número de letras no texto e na chave deve ser idêntico."
+
+    def __init__(self, modo='cifrar'):
+        if modo not in ('cifrar', 'decifrar'):
+            raise ValueError("Modo inválido. Use 'cifrar' ou 'decifrar'.")
+        super().__init__(modo)
+
+    eh_valido = staticmethod(str.isalpha)
+
+    def transformar(self, caracter_texto, caracter_chave):
+        return vernam_cifrar_decifrar.cifrar_letra(caracter_texto, caracter_chave, self.modo)
+
+class VernamModularIncremental(CifraIncremental):
+    """Versão incremental de 'vernam_modular_completo' (cifra_vernam_modular_ascii.py)."""
+
+    mensagem_erro = "A chave deve ter o mesmo número de letras que o texto para o OTP idealizado."
+
+    def __init__(self, modo='criptografia'):
+        super().__init__(modo)
+
+    eh_valido = staticmethod(str.isalpha)
+
+    def transformar(self, caracter_texto, caracter_chave):
+        return cifra_vernam_modular_ascii.cifrar_letra_modular(caracter_texto, caracter_chave, self.modo)
+
+def processar_fluxo(cifra, partes):
+    """
+    Gerador: aplica a cifra incremental a uma sequência de pares (parte do texto,
+    parte da chave) e devolve cada trecho de resultado assim que fica pronto.
+    Ao fim da sequência, verifica a regra do OTP com 'finalize()'.
+    """
+    for texto, chave in partes:
+        trecho = cifra.update(texto, chave)
+        if trecho:
+            yield trecho
+    trecho = cifra.finalize()
+    if trecho:
+        yield trecho
@@ -1,61 +1,752 @@
+import collections
+import hashlib
+import hmac
+import mmap
+import operator
 import os
 import random
+import sys
+import threading
+import weakref
 
-def gerar_chave_otp(tamanho):
+import instrumentacao
+
+try:
+    import numpy as np # Opcional: acelera o XOR em bloco (np.bitwise_xor)
+except ImportError:
+    np = None
+
+# Tamanho do bloco processado por vez no XOR sem NumPy (inteiros largos).
+# Limita a memória extra usada a poucos MB, independentemente do tamanho dos dados.
+TAMANHO_BLOCO_XOR = 1 << 20
+
+def gerar_chave_otp(tamanho, reservatorio=None):
     """
     Gera uma chave OTP verdadeiramente aleatória do tamanho especificado.
     
     Atenção: 'os.urandom' é a melhor opção para aleatoriedade criptográfica,
     mas em um cenário real, a chave deve ser gerada por uma fonte de entropia
     física e trocada de forma segura.
+
+    Se um ReservatorioPad for informado, a chave sai dos blocos pré-gerados
+    (memoryview, sem cópia) em vez de uma chamada a 'os.urandom' por mensagem.
     """
+    if instrumentacao.ATIVA:
+        instrumentacao.contar('chave.bytes', tamanho)
+
+    if reservatorio is not None:
+        return reservatorio.obter(tamanho)
+
     # A chave deve ser gerada por uma fonte de aleatoriedade criptográfica forte
     return os.urandom(tamanho)
 
-def vernam_cipher_xor(dados, chave):
+def visao_bytes(buffer):
+    """
+    Retorna uma memoryview de bytes (formato 'B', 1 dimensão) sobre o buffer,
+    sem copiar os dados. Aceita bytes, bytearray, memoryview, mmap, array etc.
+    """
+    visao = memoryview(buffer)
+    if visao.format != 'B' or visao.ndim != 1:
+        visao = visao.cast('B')
+    return visao
+
+def xor_buffers(dados, chave, saida):
+    """
+    Motor do XOR em bloco: escreve 'dados ^ chave' diretamente em 'saida'.
+
+    Usa NumPy (np.bitwise_xor) quando disponível; caso contrário, faz o XOR
+    com inteiros largos (int.from_bytes) em blocos de TAMANHO_BLOCO_XOR.
+    'saida' pode ser o próprio 'dados' (XOR no lugar).
+
+    :param dados: memoryview de bytes com o texto plano ou cifrado.
+    :param chave: memoryview de bytes da chave, do mesmo tamanho.
+    :param saida: memoryview de bytes gravável, do mesmo tamanho.
+    """
+    if np is not None:
+        np.bitwise_xor(np.frombuffer(dados, dtype=np.uint8),
+                       np.frombuffer(chave, dtype=np.uint8),
+                       out=np.frombuffer(saida, dtype=np.uint8))
+        return
+
+    total = len(dados)
+    for inicio in range(0, total, TAMANHO_BLOCO_XOR):
+        fim = min(inicio + TAMANHO_BLOCO_XOR, total)
+        bloco = (int.from_bytes(dados[inicio:fim], 'little')
+                 ^ int.from_bytes(chave[inicio:fim], 'little'))
+        saida[inicio:fim] = bloco.to_bytes(fim - inicio, 'little')
+
+def vernam_cipher_xor(dados, chave, saida=None):
     """
     Criptografa ou Descriptografa os dados usando a Cifra de Vernam (OTP)
     com a operação XOR.
     
-    :param dados: Sequência de bytes do texto plano ou texto cifrado.
+    :param dados: Sequência de bytes do texto plano ou texto cifrado
+                  (bytes, bytearray, memoryview ou qualquer buffer).
     :param chave: Sequência de bytes da chave OTP. Deve ter o mesmo tamanho.
-    :return: Sequência de bytes do texto cifrado ou texto plano.
-    :raises ValueError: Se o tamanho dos dados e da chave for diferente.
+    :param saida: Buffer gravável opcional (bytearray, memoryview, mmap) do mesmo
+                  tamanho, que recebe o resultado. Pode ser o próprio 'dados'
+                  para fazer o XOR no lugar, sem alocar memória.
+    :return: Sequência de bytes do texto cifrado ou texto plano ('saida', se informada).
+             Sem 'saida' o resultado é copiado para 'bytes'; para evitar essa cópia em
+             cargas grandes, passe um bytearray próprio como 'saida'.
+    :raises ValueError: Se o tamanho dos dados e da chave (ou da saída) for diferente.
     """
-    if len(dados) != len(chave):
+    visao_dados = visao_bytes(dados)
+    visao_chave = visao_bytes(chave)
+
+    if len(visao_dados) != len(visao_chave):
         raise ValueError("O tamanho da chave deve ser idêntico ao tamanho dos dados (One-Time Pad).")
 
-    # Realiza a operação XOR byte a byte
-    resultado = bytes([dado ^ chave_byte for dado, chave_byte in zip(dados, chave)])
-    
+    if instrumentacao.ATIVA:
+        instrumentacao.contar('xor.bytes', len(visao_dados))
+
+    if saida is None:
+        resultado = bytearray(len(visao_dados))
+        xor_buffers(visao_dados, visao_chave, memoryview(resultado))
+        return bytes(resultado)
+
+    visao_saida = visao_bytes(saida)
+    if len(visao_saida) != len(visao_dados):
+        raise ValueError("O buffer de saída deve ter o mesmo tamanho dos dados.")
+
+    # Realiza a operação XOR em bloco, direto no buffer de saída
+    xor_buffers(visao_dados, visao_chave, visao_saida)
+
+    return saida
+
+# --- Fluxo de Chave a Partir de uma Semente (modo keystream) ---
+#
+# Atenção: isto NÃO é um One-Time Pad. A segurança passa a ser a do SHAKE-256, não
+# a perfeita do OTP; em troca, só a semente curta precisa ser guardada e trocada.
+#
+# O fluxo é dividido em blocos de TAMANHO_BLOCO_FLUXO bytes, e o bloco de número
+# 'contador' é SHAKE-256(len(semente) ‖ semente ‖ len(nonce) ‖ nonce ‖ contador)
+# com essa quantidade de bytes de saída (tamanhos em 1 byte, contador em 8 bytes
+# little-endian). Os tamanhos na frente impedem que sementes ou nonces diferentes
+# (ex.: b'a' e b'a\0') virem a mesma entrada. Como cada bloco depende só do seu
+# contador, qualquer trecho do fluxo é gerado direto, sem passar pelos anteriores,
+# e cada bloco sai de uma única chamada ao hashlib.
+# O mesmo par (semente, nonce) nunca deve cifrar duas mensagens diferentes.
+
+# Bytes de saída do SHAKE-256 por contador
+TAMANHO_BLOCO_FLUXO = 64 << 10
+
+def gerar_semente(tamanho=32):
+    """Gera uma semente secreta para o modo keystream (de 16 a 64 bytes)."""
+    if not 16 <= tamanho <= 64:
+        raise ValueError("A semente deve ter entre 16 e 64 bytes.")
+    return os.urandom(tamanho)
+
+def gerar_fluxo_chave(semente, deslocamento, tamanho, nonce=b''):
+    """
+    Gera os bytes [deslocamento, deslocamento + tamanho) do fluxo de chave da semente.
+
+    :param semente: Segredo de 16 a 64 bytes (ver 'gerar_semente').
+    :param deslocamento: Posição do primeiro byte do fluxo (acesso aleatório).
+    :param tamanho: Quantidade de bytes a gerar.
+    :param nonce: Até 64 bytes que distinguem mensagens cifradas com a mesma semente.
+    :raises ValueError: Semente, nonce, deslocamento ou tamanho inválidos.
+    """
+    if not 16 <= len(semente) <= 64:
+        raise ValueError("A semente deve ter entre 16 e 64 bytes.")
+    if len(nonce) > 64:
+        raise ValueError("O nonce deve ter no máximo 64 bytes.")
+    if deslocamento < 0 or tamanho < 0:
+        raise ValueError("O deslocamento e o tamanho não podem ser negativos.")
+
+    if instrumentacao.ATIVA:
+        instrumentacao.contar('chave.bytes_fluxo', tamanho)
+
+    # Semente e nonce são absorvidos uma vez; cada bloco copia esse estado
+    base = hashlib.shake_256(bytes([len(semente)]) + bytes(semente) + bytes([len(nonce)]) + bytes(nonce))
+    primeiro = deslocamento // TAMANHO_BLOCO_FLUXO
+    ultimo = -(-(deslocamento + tamanho) // TAMANHO_BLOCO_FLUXO)
+
+    def bloco(contador):
+        h = base.copy()
+        h.update(contador.to_bytes(8, 'little'))
+        return h.digest(TAMANHO_BLOCO_FLUXO)
+
+    fluxo = b''.join(map(bloco, range(primeiro, ultimo)))
+    recuo = deslocamento - primeiro * TAMANHO_BLOCO_FLUXO
+    return fluxo[recuo:recuo + tamanho]
+
+def vernam_fluxo_xor(dados, semente, deslocamento=0, nonce=b'', saida=None):
+    """
+    Criptografa ou Descriptografa com XOR usando o fluxo de chave da semente no
+    lugar de um pad. 'dados' é o trecho do texto que começa na posição
+    'deslocamento' da mensagem, então qualquer faixa de um cifrado pode ser
+    decifrada isoladamente.
+
+    O fluxo é gerado em blocos de TAMANHO_BLOCO_XOR e passado direto ao XOR,
+    sem montar uma chave do tamanho dos dados.
+
+    :return: bytearray com o resultado, ou o próprio 'saida' se ele for informado.
+    """
+    visao_dados = visao_bytes(dados)
+    total = len(visao_dados)
+
+    if saida is None:
+        resultado = bytearray(total)
+        visao_saida = memoryview(resultado)
+    else:
+        visao_saida = visao_bytes(saida)
+        if len(visao_saida) != total:
+            raise ValueError("O buffer de saída deve ter o mesmo tamanho dos dados.")
+
+    if instrumentacao.ATIVA:
+        instrumentacao.contar('xor.bytes', total)
+
+    for inicio in range(0, total, TAMANHO_BLOCO_XOR):
+        fim = min(inicio + TAMANHO_BLOCO_XOR, total)
+        fluxo = gerar_fluxo_chave(semente, deslocamento + inicio, fim - inicio, nonce)
+        xor_buffers(visao_dados[inicio:fim], memoryview(fluxo), visao_saida[inicio:fim])
+
+    return resultado if saida is None else saida
+
+# --- Reservatório de Pad (chaves pré-geradas) ---
+
+# Tamanho de cada bloco aleatório gerado em segundo plano pelo reservatório.
+TAMANHO_BLOCO_RESERVATORIO = 4 << 20
+
+# Reservatórios abertos, reiniciados no processo filho depois de um fork
+_RESERVATORIOS = weakref.WeakSet()
+
+def _reiniciar_reservatorios_no_filho():
+    for reservatorio in list(_RESERVATORIOS):
+        reservatorio._reiniciar_no_filho()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reiniciar_reservatorios_no_filho)
+
+class ReservatorioPad:
+    """
+    Reservatório de bytes aleatórios pré-gerados para chaves OTP.
+
+    Uma thread em segundo plano lê grandes blocos de 'os.urandom' e os mantém
+    prontos, tirando a geração de chave do caminho de cada mensagem. Cada pedido
+    recebe uma fatia nova (memoryview, sem cópia) e o reservatório nunca volta
+    atrás: um byte entregue (ou descartado no fim de um bloco) não é entregue de novo.
+
+    Depois de um fork, o filho descarta os blocos herdados do pai (que o pai também
+    vai entregar) e inicia a sua própria thread de reabastecimento.
+
+    Uso:
+        with ReservatorioPad() as reservatorio:
+            chave = gerar_chave_otp(len(dados), reservatorio)
+    """
+
+    def __init__(self, tamanho_bloco=TAMANHO_BLOCO_RESERVATORIO, blocos_reserva=4, nivel_minimo=2):
+        """
+        :param tamanho_bloco: Bytes gerados por leitura de 'os.urandom'.
+        :param blocos_reserva: Quantos blocos prontos a thread tenta manter.
+        :param nivel_minimo: Quando restarem menos blocos prontos que isso, a thread é acordada.
+        """
+        if tamanho_bloco <= 0 or blocos_reserva <= 0:
+            raise ValueError("O tamanho do bloco e a reserva devem ser positivos.")
+        if not 0 < nivel_minimo <= blocos_reserva:
+            raise ValueError("O nível mínimo deve estar entre 1 e a quantidade de blocos de reserva.")
+
+        self.tamanho_bloco = tamanho_bloco
+        self.blocos_reserva = blocos_reserva
+        self.nivel_minimo = nivel_minimo
+
+        self._fechado = False
+        self._iniciar()
+        _RESERVATORIOS.add(self)
+
+    def _iniciar(self):
+        """Começa com o reservatório vazio e inicia a thread de reabastecimento."""
+        self._prontos = collections.deque()
+        self._bloco_atual = memoryview(b'')
+        self._posicao = 0
+        self._condicao = threading.Condition()
+
+        self._thread = threading.Thread(target=self._reabastecer, name="ReservatorioPad", daemon=True)
+        self._thread.start()
+
+    def _reiniciar_no_filho(self):
+        # O filho herda os blocos prontos e o atual, que o pai também vai entregar
+        # (chave repetida = two-time pad), mas não herda a thread nem o estado da
+        # trava: descarta tudo e recomeça, como se o reservatório fosse novo
+        if self._fechado:
+            self._prontos = collections.deque()
+            self._bloco_atual = memoryview(b'')
+            self._posicao = 0
+            self._condicao = threading.Condition()
+        else:
+            self._iniciar()
+
+    def _reabastecer(self):
+        """Laço da thread: gera blocos até completar a reserva e dorme até o nível mínimo."""
+        while True:
+            with self._condicao:
+                while not self._fechado and len(self._prontos) >= self.nivel_minimo:
+                    self._condicao.wait()
+                if self._fechado:
+                    return
+                faltam = self.blocos_reserva - len(self._prontos)
+
+            # A leitura de entropia acontece fora da trava, sem bloquear quem consome
+            novos = [os.urandom(self.tamanho_bloco) for _ in range(faltam)]
+
+            with self._condicao:
+                self._prontos.extend(novos)
+                self._condicao.notify_all()
+
+    def obter(self, tamanho):
+        """
+        Retorna 'tamanho' bytes aleatórios nunca entregues antes, como memoryview.
+
+        Pedidos maiores que um bloco são atendidos direto por 'os.urandom'.
+        Se o resto do bloco atual não bastar, ele é descartado (nunca reaproveitado).
+        """
+        if tamanho < 0:
+            raise ValueError("O tamanho da chave não pode ser negativo.")
+        if tamanho > self.tamanho_bloco:
+            return memoryview(os.urandom(tamanho))
+
+        with self._condicao:
+            if self._fechado:
+                raise ValueError("O reservatório de pad está fechado.")
+
+            if len(self._bloco_atual) - self._posicao < tamanho:
+                while not self._prontos:
+                    self._condicao.notify_all()
+                    self._condicao.wait()
+                    if self._fechado:
+                        raise ValueError("O reservatório de pad está fechado.")
+                self._bloco_atual = memoryview(self._prontos.popleft())
+                self._posicao = 0
+                if len(self._prontos) < self.nivel_minimo:
+                    self._condicao.notify_all()
+
+            fatia = self._bloco_atual[self._posicao:self._posicao + tamanho]
+            self._posicao += tamanho
+            return fatia
+
+    def fechar(self):
+        """Encerra a thread de reabastecimento e descarta os blocos prontos."""
+        with self._condicao:
+            self._fechado = True
+            self._prontos.clear()
+            self._condicao.notify_all()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+# --- Modo Arquivo (streaming com mmap) ---
+
+# Tamanho de cada bloco processado no modo arquivo. A memória usada fica
+# limitada a poucos blocos, não importa o tamanho do arquivo.
+TAMANHO_BLOCO_ARQUIVO = 16 << 20
+
+def mapear_janela(arquivo, inicio, tamanho):
+    """
+    Mapeia em memória (somente leitura) apenas a janela [inicio, inicio + tamanho)
+    do arquivo. O mmap exige um offset alinhado a ALLOCATIONGRANULARITY, então a
+    janela é mapeada a partir do múltiplo anterior e recortada com memoryview.
+
+    :return: Tupla (mmap, memoryview da janela). O mmap deve ser fechado depois.
+    """
+    inicio_alinhado = inicio - (inicio % mmap.ALLOCATIONGRANULARITY)
+    recuo = inicio - inicio_alinhado
+    mapa = mmap.mmap(arquivo.fileno(), recuo + tamanho, offset=inicio_alinhado, access=mmap.ACCESS_READ)
+    return mapa, memoryview(mapa)[recuo:recuo + tamanho]
+
+def xor_em_janelas(entrada, pad, saida, tamanho, deslocamento_pad, tamanho_bloco, por_bloco=None):
+    """
+    Laço do modo arquivo: faz o XOR dos 'tamanho' primeiros bytes de 'entrada'
+    com o pad a partir de 'deslocamento_pad', janela por janela, e grava em 'saida'.
+
+    :param entrada, pad, saida: Arquivos binários abertos.
+    :param por_bloco: Função opcional chamada como por_bloco(bloco_entrada, bloco_saida)
+                      depois do XOR de cada janela e antes de gravá-la.
+    """
+    buffer_saida = bytearray(min(tamanho_bloco, tamanho))
+
+    for inicio in range(0, tamanho, tamanho_bloco):
+        tamanho_atual = min(tamanho_bloco, tamanho - inicio)
+        mapa_dados, bloco_dados = mapear_janela(entrada, inicio, tamanho_atual)
+        mapa_pad, bloco_pad = mapear_janela(pad, deslocamento_pad + inicio, tamanho_atual)
+        try:
+            bloco_saida = memoryview(buffer_saida)[:tamanho_atual]
+            vernam_cipher_xor(bloco_dados, bloco_pad, saida=bloco_saida)
+            if por_bloco is not None:
+                por_bloco(bloco_dados, bloco_saida)
+            saida.write(bloco_saida)
+        finally:
+            # As memoryviews precisam ser liberadas antes de fechar os mmaps
+            bloco_dados.release()
+            bloco_pad.release()
+            mapa_dados.close()
+            mapa_pad.close()
+
+def rejeitar_mesmo_arquivo(caminho_saida, *caminhos):
+    """
+    Impede que a saída seja um dos arquivos lidos: abri-la com 'wb' truncaria a
+    entrada (ou o pad) antes de ser mapeada.
+
+    :raises ValueError: Se 'caminho_saida' for o mesmo arquivo de um dos 'caminhos'.
+    """
+    if os.path.exists(caminho_saida) and any(os.path.samefile(caminho_saida, caminho) for caminho in caminhos):
+        raise ValueError("O arquivo de saída não pode ser o de entrada nem o do pad.")
+
+def vernam_arquivo_xor(caminho_entrada, caminho_pad, caminho_saida, deslocamento_pad=0,
+                       tamanho_bloco=TAMANHO_BLOCO_ARQUIVO):
+    """
+    Criptografa ou Descriptografa um arquivo inteiro com a Cifra de Vernam (XOR),
+    usando como chave os bytes de um arquivo de pad a partir de 'deslocamento_pad'.
+
+    O arquivo de entrada e o pad são mapeados em memória em janelas de
+    'tamanho_bloco' bytes, e o XOR é feito bloco a bloco em um buffer reutilizado,
+    então o uso de memória é constante mesmo para arquivos de vários GB.
+
+    :param caminho_entrada: Arquivo com o texto plano ou texto cifrado.
+    :param caminho_pad: Arquivo com os bytes da chave OTP (pad).
+    :param caminho_saida: Arquivo que recebe o resultado (sobrescrito).
+    :param deslocamento_pad: Posição do pad onde começa a chave desta mensagem.
+    :param tamanho_bloco: Quantidade de bytes processada por vez.
+    :return: Quantidade de bytes do pad consumidos (igual ao tamanho da entrada).
+    :raises ValueError: Se o pad não tiver bytes suficientes a partir do deslocamento,
+                        ou se a saída for o próprio arquivo de entrada ou de pad.
+    """
+    if deslocamento_pad < 0:
+        raise ValueError("O deslocamento do pad não pode ser negativo.")
+    if tamanho_bloco <= 0:
+        raise ValueError("O tamanho do bloco deve ser positivo.")
+
+    tamanho = os.path.getsize(caminho_entrada)
+    tamanho_pad = os.path.getsize(caminho_pad)
+
+    # Assegura a condição do OTP: cada byte dos dados precisa de um byte novo do pad
+    if deslocamento_pad + tamanho > tamanho_pad:
+        raise ValueError("O pad não tem bytes suficientes a partir do deslocamento informado (One-Time Pad).")
+    rejeitar_mesmo_arquivo(caminho_saida, caminho_entrada, caminho_pad)
+
+    try:
+        with open(caminho_entrada, 'rb') as entrada, open(caminho_pad, 'rb') as pad, \
+                open(caminho_saida, 'wb') as saida:
+            xor_em_janelas(entrada, pad, saida, tamanho, deslocamento_pad, tamanho_bloco)
+    except BaseException:
+        # Não deixa uma saída pela metade com cara de resultado completo
+        if os.path.exists(caminho_saida):
+            os.remove(caminho_saida)
+        raise
+
+    return tamanho
+
+# --- Modo Autenticado (XOR + MAC de Wegman–Carter) ---
+#
+# O XOR sozinho não detecta alterações: trocar um bit do cifrado troca o mesmo bit
+# do texto plano. No modo autenticado, bytes extras do pad (logo depois dos bytes
+# da mensagem) formam a chave de um hash universal de uso único, calculado sobre o
+# cifrado no mesmo laço em blocos do XOR, sem uma segunda leitura dos dados.
+#
+# O hash segue o UMAC em dois níveis:
+#   1. NH em blocos de TAMANHO_BLOCO_NH bytes, em 4 faixas (chave deslocada de 4
+#      palavras a cada faixa): soma de ((m[2i] + k[2i]) mod 2^32) * ((m[2i+1] + k[2i+1]) mod 2^32)
+#      mod 2^64, vetorizado com NumPy. Cada bloco vira 32 bytes.
+#   2. Polinômio módulo o primo 2^521 - 1 cujos coeficientes são os resumos NH de
+#      dois blocos (64 bytes), terminado pelo tamanho da mensagem.
+# A etiqueta é (hash + s) mod 2^128, com 's' também tirado do pad. Como cada parte
+# da chave é usada uma única vez, a falsificação tem probabilidade desprezível
+# (da ordem de blocos / 2^128), sem depender de nenhuma suposição computacional.
+
+TAMANHO_BLOCO_NH = 512
+FAIXAS_NH = 4
+TAMANHO_ETIQUETA = 16
+PRIMO_POLINOMIO = (1 << 521) - 1
+
+# Bytes do pad usados pela chave do MAC: NH (bloco + deslocamento das faixas), r do polinômio e s
+TAMANHO_CHAVE_NH = TAMANHO_BLOCO_NH + 16 * (FAIXAS_NH - 1)
+TAMANHO_CHAVE_MAC = TAMANHO_CHAVE_NH + 66 + TAMANHO_ETIQUETA
+
+_PALAVRAS_NH = TAMANHO_BLOCO_NH // 4
+
+# Bytes passados ao NH por vez: pedaços pequenos o bastante para os vetores
+# intermediários ficarem no cache
+SUBBLOCO_NH = 64 << 10
+
+# Bytes de resumos NH que formam cada coeficiente do polinômio (< 2^521)
+COEFICIENTE_POLINOMIO = 64
+# Coeficientes somados por vez com as potências de r pré-calculadas
+GRUPO_POLINOMIO = 1024
+
+class AutenticadorPad:
+    """
+    Hash universal incremental do modo autenticado. Os pedaços passados para
+    'atualizar' devem ter tamanho múltiplo de TAMANHO_BLOCO_NH, exceto o último.
+    """
+
+    def __init__(self, chave_mac):
+        chave_mac = bytes(chave_mac)
+        if len(chave_mac) != TAMANHO_CHAVE_MAC:
+            raise ValueError(f"A chave do MAC deve ter {TAMANHO_CHAVE_MAC} bytes do pad.")
+        chave_nh = chave_mac[:TAMANHO_CHAVE_NH]
+        palavras = [int.from_bytes(chave_nh[i:i + 4], 'little') for i in range(0, TAMANHO_CHAVE_NH, 4)]
+        self._faixas = [palavras[4 * j:4 * j + _PALAVRAS_NH] for j in range(FAIXAS_NH)]
+        if np is not None:
+            self._faixas_np = [np.array(faixa, dtype=np.uint32) for faixa in self._faixas]
+        self._r = int.from_bytes(chave_mac[TAMANHO_CHAVE_NH:TAMANHO_CHAVE_NH + 66], 'little') % PRIMO_POLINOMIO
+        self._s = int.from_bytes(chave_mac[-TAMANHO_ETIQUETA:], 'little')
+        self._potencias = [1]  # r^0, r^1, ... calculadas só até onde for preciso
+        self._acumulado = 0
+        self._pendente = b''  # Resumo NH que ainda não completou um coeficiente
+        self._tamanho = 0
+        self._finalizado = False
+
+    def _nh(self, blocos):
+        """32 bytes (4 faixas de 64 bits) para cada bloco completo de 'blocos'."""
+        if np is not None:
+            partes = []
+            for inicio in range(0, len(blocos), SUBBLOCO_NH):
+                palavras = np.frombuffer(blocos[inicio:inicio + SUBBLOCO_NH], dtype='<u4').reshape(-1, _PALAVRAS_NH)
+                faixas = []
+                for chave in self._faixas_np:
+                    # Soma mod 2^32; cada par (m[2i], m[2i+1]) vira um uint64 (palavra baixa, alta)
+                    pares = (palavras + chave).view('<u8')
+                    baixas = pares & np.uint64(0xFFFFFFFF)
+                    pares >>= np.uint64(32)
+                    baixas *= pares
+                    faixas.append(baixas.sum(axis=1, dtype=np.uint64))  # mod 2^64
+                partes.append(np.stack(faixas, axis=1).astype('<u8').tobytes())
+            return b''.join(partes)
+
+        saida = bytearray()
+        for inicio in range(0, len(blocos), TAMANHO_BLOCO_NH):
+            palavras = [int.from_bytes(blocos[i:i + 4], 'little')
+                        for i in range(inicio, inicio + TAMANHO_BLOCO_NH, 4)]
+            for chave in self._faixas:
+                soma = [(m + k) & 0xFFFFFFFF for m, k in zip(palavras, chave)]
+                total = sum(a * b for a, b in zip(soma[0::2], soma[1::2])) & 0xFFFFFFFFFFFFFFFF
+                saida += total.to_bytes(8, 'little')
+        return saida
+
+    def _polinomio(self, coeficientes):
+        """
+        Acrescenta os coeficientes ao polinômio: h = h·r^m + Σ c_i·r^(m-1-i) mod p,
+        em grupos de até GRUPO_POLINOMIO com as potências de r pré-calculadas
+        (a soma dos produtos roda em C, com uma única redução por grupo).
+        """
+        potencias = self._potencias
+        for inicio in range(0, len(coeficientes), GRUPO_POLINOMIO):
+            grupo = coeficientes[inicio:inicio + GRUPO_POLINOMIO]
+            m = len(grupo)
+            while len(potencias) <= m:
+                potencias.append(potencias[-1] * self._r % PRIMO_POLINOMIO)
+            soma = sum(map(operator.mul, grupo, reversed(potencias[:m])))
+            self._acumulado = (self._acumulado * potencias[m] + soma) % PRIMO_POLINOMIO
+
+    def atualizar(self, pedaco):
+        """Acrescenta um pedaço do cifrado ao hash."""
+        if self._finalizado:
+            raise ValueError("O autenticador já foi finalizado.")
+        if self._tamanho % TAMANHO_BLOCO_NH:
+            raise ValueError(f"Só o último pedaço pode ter tamanho que não seja múltiplo de {TAMANHO_BLOCO_NH}.")
+        pedaco = visao_bytes(pedaco)
+        self._tamanho += len(pedaco)
+        resto = len(pedaco) % TAMANHO_BLOCO_NH
+        if resto:
+            # Último bloco incompleto: completado com zeros (o tamanho entra no fim do hash)
+            pedaco = bytes(pedaco) + bytes(TAMANHO_BLOCO_NH - resto)
+        resumos = self._pendente + self._nh(pedaco)
+        completos = len(resumos) - len(resumos) % COEFICIENTE_POLINOMIO
+        self._polinomio([int.from_bytes(resumos[i:i + COEFICIENTE_POLINOMIO], 'little')
+                         for i in range(0, completos, COEFICIENTE_POLINOMIO)])
+        self._pendente = resumos[completos:]
+
+    def etiqueta(self):
+        """Finaliza o hash e devolve a etiqueta de TAMANHO_ETIQUETA bytes."""
+        if not self._finalizado:
+            finais = [int.from_bytes(self._pendente, 'little')] if self._pendente else []
+            # O tamanho fecha o polinômio, e o r a mais evita um termo constante:
+            # sem ele, acrescentar zeros à mensagem mudaria a etiqueta de forma previsível
+            self._polinomio(finais + [self._tamanho, 0])
+            self._finalizado = True
+        valor = (self._acumulado + self._s) % (1 << (8 * TAMANHO_ETIQUETA))
+        return valor.to_bytes(TAMANHO_ETIQUETA, 'little')
+
+def separar_chave_autenticada(chave, tamanho):
+    """Divide a chave do modo autenticado em (chave do XOR, chave do MAC)."""
+    visao_chave = visao_bytes(chave)
+    if len(visao_chave) != tamanho + TAMANHO_CHAVE_MAC:
+        raise ValueError(f"No modo autenticado a chave deve ter o tamanho dos dados + {TAMANHO_CHAVE_MAC} bytes (One-Time Pad).")
+    return visao_chave[:tamanho], visao_chave[tamanho:]
+
+def xor_autenticado(dados, chave, saida, cifrando):
+    """
+    Laço comum do modo autenticado em memória: XOR em blocos de TAMANHO_BLOCO_XOR
+    e hash do cifrado no mesmo bloco (a saída ao cifrar, a entrada ao decifrar).
+
+    :return: Tupla (resultado, etiqueta calculada).
+    """
+    visao_dados = visao_bytes(dados)
+    total = len(visao_dados)
+    chave_xor, chave_mac = separar_chave_autenticada(chave, total)
+    resultado = bytearray(total) if saida is None else saida
+    visao_saida = visao_bytes(resultado)
+    if len(visao_saida) != total:
+        raise ValueError("O buffer de saída deve ter o mesmo tamanho dos dados.")
+
+    if instrumentacao.ATIVA:
+        instrumentacao.contar('xor.bytes', total)
+
+    autenticador = AutenticadorPad(chave_mac)
+    for inicio in range(0, total, TAMANHO_BLOCO_XOR):
+        fim = min(inicio + TAMANHO_BLOCO_XOR, total)
+        if not cifrando:
+            # O hash lê o cifrado antes do XOR, que pode sobrescrevê-lo (saida = cifrado)
+            autenticador.atualizar(visao_dados[inicio:fim])
+        xor_buffers(visao_dados[inicio:fim], chave_xor[inicio:fim], visao_saida[inicio:fim])
+        if cifrando:
+            autenticador.atualizar(visao_saida[inicio:fim])
+
+    return resultado, autenticador.etiqueta()
+
+def cifrar_autenticado_xor(dados, chave, saida=None):
+    """
+    Criptografa com XOR e calcula a etiqueta do cifrado na mesma passada.
+
+    :param dados: Texto plano (bytes ou qualquer buffer).
+    :param chave: Pad com len(dados) + TAMANHO_CHAVE_MAC bytes (gerar_chave_otp).
+    :param saida: Buffer gravável opcional para o cifrado, do mesmo tamanho dos dados.
+    :return: Tupla (cifrado, etiqueta). O cifrado é um bytearray novo ou o próprio 'saida'.
+    """
+    return xor_autenticado(dados, chave, saida, cifrando=True)
+
+def decifrar_autenticado_xor(cifrado, etiqueta, chave, saida=None):
+    """
+    Verifica a etiqueta e descriptografa na mesma passada. O texto plano só é
+    devolvido se a etiqueta conferir; caso contrário o buffer de saída é zerado.
+
+    :raises ValueError: Etiqueta inválida (cifrado ou etiqueta alterados, ou pad errado).
+    """
+    resultado, calculada = xor_autenticado(cifrado, chave, saida, cifrando=False)
+    if not hmac.compare_digest(calculada, bytes(etiqueta)):
+        visao_bytes(resultado)[:] = bytes(len(resultado))
+        raise ValueError("Falha na autenticação: o cifrado foi alterado ou o pad não confere.")
     return resultado
 
+def vernam_arquivo_autenticado_xor(caminho_entrada, caminho_pad, caminho_saida, modo='cifrar',
+                                   deslocamento_pad=0, tamanho_bloco=TAMANHO_BLOCO_ARQUIVO):
+    """
+    Versão autenticada de 'vernam_arquivo_xor'. Ao cifrar, a etiqueta é gravada
+    nos últimos TAMANHO_ETIQUETA bytes do arquivo de saída; ao decifrar, é lida
+    do fim do arquivo de entrada.
+
+    Ao decifrar, o texto plano vai para um arquivo temporário ao lado da saída,
+    que só é renomeado para 'caminho_saida' depois que a etiqueta confere.
+
+    :param modo: 'cifrar' ou 'decifrar'.
+    :return: Quantidade de bytes do pad consumidos (mensagem + TAMANHO_CHAVE_MAC).
+    :raises ValueError: Pad insuficiente, modo inválido, arquivo truncado, etiqueta inválida
+                        ou saída igual ao arquivo de entrada ou de pad.
+    """
+    if modo not in ('cifrar', 'decifrar'):
+        raise ValueError("Modo inválido. Use 'cifrar' ou 'decifrar'.")
+    if deslocamento_pad < 0:
+        raise ValueError("O deslocamento do pad não pode ser negativo.")
+    if tamanho_bloco <= 0:
+        raise ValueError("O tamanho do bloco deve ser positivo.")
+    # Os pedaços passados ao hash precisam ser múltiplos do bloco NH
+    tamanho_bloco = -(-tamanho_bloco // TAMANHO_BLOCO_NH) * TAMANHO_BLOCO_NH
+
+    cifrando = modo == 'cifrar'
+    tamanho = os.path.getsize(caminho_entrada)
+    if not cifrando:
+        if tamanho < TAMANHO_ETIQUETA:
+            raise ValueError("Arquivo cifrado truncado: etiqueta ausente.")
+        tamanho -= TAMANHO_ETIQUETA
+
+    consumidos = tamanho + TAMANHO_CHAVE_MAC
+    if deslocamento_pad + consumidos > os.path.getsize(caminho_pad):
+        raise ValueError("O pad não tem bytes suficientes a partir do deslocamento informado (One-Time Pad).")
+    rejeitar_mesmo_arquivo(caminho_saida, caminho_entrada, caminho_pad)
+
+    caminho_escrita = caminho_saida if cifrando else caminho_saida + '.parcial'
+    try:
+        with open(caminho_entrada, 'rb') as entrada, open(caminho_pad, 'rb') as pad, \
+                open(caminho_escrita, 'wb') as saida:
+            pad.seek(deslocamento_pad + tamanho)
+            autenticador = AutenticadorPad(pad.read(TAMANHO_CHAVE_MAC))
+
+            # O hash é sempre do cifrado: a saída ao cifrar, a entrada ao decifrar
+            def autenticar(bloco_entrada, bloco_saida):
+                autenticador.atualizar(bloco_saida if cifrando else bloco_entrada)
+
+            xor_em_janelas(entrada, pad, saida, tamanho, deslocamento_pad, tamanho_bloco, autenticar)
+
+            if cifrando:
+                saida.write(autenticador.etiqueta())
+                return consumidos
+            entrada.seek(tamanho)
+            etiqueta_valida = hmac.compare_digest(autenticador.etiqueta(), entrada.read(TAMANHO_ETIQUETA))
+    except BaseException:
+        if os.path.exists(caminho_escrita):
+            os.remove(caminho_escrita)
+        raise
+
+    if not etiqueta_valida:
+        os.remove(caminho_escrita)
+        raise ValueError("Falha na autenticação: o cifrado foi alterado ou o pad não confere.")
+    os.replace(caminho_escrita, caminho_saida)
+    return consumidos
+
 # --- Exemplo de Uso ---
 
-# 1. Defina a mensagem (Texto Plano)
-texto_plano = input("Digite a mensagem: ")
-dados_plano = texto_plano.encode('utf-8') # Converte a string para bytes
+def exemplo_interativo():
+    # 1. Defina a mensagem (Texto Plano)
+    texto_plano = input("Digite a mensagem: ")
+    dados_plano = texto_plano.encode('utf-8') # Converte a string para bytes
+
+    # 2. Gere a chave OTP (com o mesmo tamanho da mensagem)
+    tamanho_chave = len(dados_plano)
+    chave_otp = gerar_chave_otp(tamanho_chave)
+
+    print(f"Texto Plano Original: {texto_plano}")
+    # print(f"Chave OTP (bytes - visualização parcial): {chave_otp[:10]}...") 
+    print("-" * 30)
 
-# 2. Gere a chave OTP (com o mesmo tamanho da mensagem)
-tamanho_chave = len(dados_plano)
-chave_otp = gerar_chave_otp(tamanho_chave)
+    ## Criptografia
+    # 3. Criptografe o Texto Plano usando a chave OTP
+    dados_cifrados = vernam_cipher_xor(dados_plano, chave_otp)
+    texto_cifrado_hex = dados_cifrados.hex() # Representação em hexadecimal para visualização
 
-print(f"Texto Plano Original: {texto_plano}")
-# print(f"Chave OTP (bytes - visualização parcial): {chave_otp[:10]}...") 
-print("-" * 30)
+    print(f"Texto Cifrado (Hex): {texto_cifrado_hex}")
+    print("-" * 30)
 
-## Criptografia
-# 3. Criptografe o Texto Plano usando a chave OTP
-dados_cifrados = vernam_cipher_xor(dados_plano, chave_otp)
-texto_cifrado_hex = dados_cifrados.hex() # Representação em hexadecimal para visualização
+    ## Descriptografia
+    # 4. Descriptografe o Texto Cifrado usando a *mesma* chave OTP
+    # Note que a mesma função é usada (simetria do XOR: A ^ B ^ B = A)
+    dados_descriptografados = vernam_cipher_xor(dados_cifrados, chave_otp)
+    texto_descriptografado = dados_descriptografados.decode('utf-8') # Converte os bytes de volta para string
+
+    print(f"Texto Descriptografado: {texto_descriptografado}")
+
+def exemplo_arquivo(argumentos):
+    """
+    Modo arquivo pela linha de comando:
+    python "cifra_vernam(otp).py" ENTRADA PAD SAIDA [DESLOCAMENTO_PAD]
+    """
+    caminho_entrada, caminho_pad, caminho_saida = argumentos[:3]
+    deslocamento_pad = int(argumentos[3]) if len(argumentos) > 3 else 0
 
-print(f"Texto Cifrado (Hex): {texto_cifrado_hex}")
-print("-" * 30)
+    try:
+        consumidos = vernam_arquivo_xor(caminho_entrada, caminho_pad, caminho_saida, deslocamento_pad)
+    except ValueError as e:
+        print(f"ERRO de OTP: {e}")
+        sys.exit(1)
 
-## Descriptografia
-# 4. Descriptografe o Texto Cifrado usando a *mesma* chave OTP
-# Note que a mesma função é usada (simetria do XOR: A ^ B ^ B = A)
-dados_descriptografados = vernam_cipher_xor(dados_cifrados, chave_otp)
-texto_descriptografado = dados_descriptografados.decode('utf-8') # Converte os bytes de volta para string
+    print(f"Arquivo gerado: {caminho_saida}")
+    print(f"Bytes do pad consumidos: {consumidos} (próximo deslocamento livre: {deslocamento_pad + consumidos})")
 
-print(f"Texto Descriptografado: {texto_descriptografado}")
\ No newline at end of file
+if __name__ == "__main__":
+    if len(sys.argv) >= 4:
+        exemplo_arquivo(sys.argv[1:])
+    else:
+        exemplo_interativo()
\ No newline at end of file
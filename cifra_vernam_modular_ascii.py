@@ -1,6 +1,9 @@
-import random
 import string
 
+import instrumentacao
+import motor_mod26
+from gerador_chaves import gerar_chave_alfabeto
+
 # Define os alfabetos para mapeamento
 ALFABETO_MAIUSCULAS = string.ascii_uppercase  # 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
 ALFABETO_MINUSCULAS = string.ascii_lowercase  # 'abcdefghijklmnopqrstuvwxyz'
@@ -12,7 +15,37 @@ def gerar_chave_otp_alfabetica(tamanho):
     do tamanho especificado. 
     """
     alfabeto_completo = string.ascii_letters
-    return ''.join(random.choice(alfabeto_completo) for cada in range(tamanho))
+    # 'os.urandom' em blocos (criptográfico), no lugar de 'random.choice'
+    return gerar_chave_alfabeto(tamanho, alfabeto_completo)
+
+def cifrar_letra_modular(caracter_texto, caracter_chave, modo='criptografia'):
+    """
+    Cifra (ou decifra) uma única letra do texto com a letra correspondente da chave,
+    no alfabeto do mesmo caso da letra do texto.
+    """
+    if caracter_texto.isupper():
+        # Processamento para MAIÚSCULAS
+        alfabeto = ALFABETO_MAIUSCULAS
+    else:
+        # Processamento para MINÚSCULAS
+        alfabeto = ALFABETO_MINUSCULAS
+    
+    # Garante que a chave correspondente também seja tratada no mesmo caso para o cálculo de índice
+    valor_chave = alfabeto.index(caracter_chave.upper() if caracter_texto.isupper() else caracter_chave.lower())
+
+    # 1. Converte letra para valor numérico (A/a=0, Z/z=25)
+    valor_texto = alfabeto.index(caracter_texto)
+    
+    if modo == 'criptografia':
+        # 2. CRIPTOGRAFIA: (Plano + Chave) mod 26
+        valor_resultante = (valor_texto + valor_chave) % TAMANHO_ALFABETO
+    else:
+        # 2. DESCRIPTOGRAFIA: (Cifrado - Chave) mod 26
+        valor_resultante = (valor_texto - valor_chave) % TAMANHO_ALFABETO
+
+    # 3. Converte o valor numérico de volta para letra
+    return alfabeto[valor_resultante]
+
 def vernam_modular_completo(texto, chave, modo='criptografia'):
     """
     Implementa a Cifra de Vernam usando aritmética modular (mod 26) 
@@ -24,6 +57,19 @@ def vernam_modular_completo(texto, chave, modo='criptografia'):
     :return: Texto cifrado (ou plano) resultante.
     """
     
+    medir = instrumentacao.ATIVA
+    if medir:
+        inicio = instrumentacao.relogio()
+
+    if motor_mod26.pode_usar(texto, chave):
+        # Texto e chave ASCII: mesmo resultado, calculado de forma vetorizada (NumPy)
+        saida = motor_mod26.vernam_mod26(texto, chave, 1 if modo == 'criptografia' else -1,
+                                         "A chave deve ter o mesmo número de letras que o texto para o OTP idealizado.")
+        if medir:
+            instrumentacao.registrar_tempo('vernam_modular_completo.numpy', instrumentacao.relogio() - inicio)
+            instrumentacao.contar('vernam_modular_completo.caracteres', len(texto))
+        return saida
+
     # Remove caracteres não alfabéticos do texto e da chave para garantir 
     # que a chave só combine com letras. Isso simplifica o controle de tamanho.
     letras_texto = [caracter for caracter in texto if caracter.isalpha()]
@@ -34,6 +80,9 @@ def vernam_modular_completo(texto, chave, modo='criptografia'):
 
     resultado = list(texto)
     indice_chave = 0
+    if medir:
+        fim_filtro = instrumentacao.relogio()
+        instrumentacao.registrar_tempo('vernam_modular_completo.filtro', fim_filtro - inicio)
 
     # Iteramos sobre a posição original do texto para preservar espaços e pontuação
     for caracter in range(len(texto)):
@@ -42,53 +91,45 @@ def vernam_modular_completo(texto, chave, modo='criptografia'):
         if caracter_texto.isalpha():
             caracter_chave = letras_chave[indice_chave]
 
-            if caracter_texto.isupper():
-                # Processamento para MAIÚSCULAS
-                alfabeto = ALFABETO_MAIUSCULAS
-            else:
-                # Processamento para MINÚSCULAS
-                alfabeto = ALFABETO_MINUSCULAS
-            
-            # Garante que a chave correspondente também seja tratada no mesmo caso para o cálculo de índice
-            valor_chave = alfabeto.index(caracter_chave.upper() if caracter_texto.isupper() else caracter_chave.lower())
-
-            # 1. Converte letra para valor numérico (A/a=0, Z/z=25)
-            valor_texto = alfabeto.index(caracter_texto)
-            
-            if modo == 'criptografia':
-                # 2. CRIPTOGRAFIA: (Plano + Chave) mod 26
-                valor_resultante = (valor_texto + valor_chave) % TAMANHO_ALFABETO
-            else:
-                # 2. DESCRIPTOGRAFIA: (Cifrado - Chave) mod 26
-                valor_resultante = (valor_texto - valor_chave) % TAMANHO_ALFABETO
-
-            # 3. Converte o valor numérico de volta para letra
-            resultado[caracter] = alfabeto[valor_resultante]
+            resultado[caracter] = cifrar_letra_modular(caracter_texto, caracter_chave, modo)
             
             # Avança para o próximo caractere da chave apenas se foi uma letra processada
             indice_chave += 1
     
-    return "".join(resultado)
+    if not medir:
+        return "".join(resultado)
+
+    fim_laco = instrumentacao.relogio()
+    saida = "".join(resultado)
+    instrumentacao.registrar_tempo('vernam_modular_completo.laco', fim_laco - fim_filtro)
+    instrumentacao.registrar_tempo('vernam_modular_completo.juncao', instrumentacao.relogio() - fim_laco)
+    instrumentacao.contar('vernam_modular_completo.caracteres', len(texto))
+    instrumentacao.contar('vernam_modular_completo.ignorados', len(texto) - indice_chave)
+    return saida
 
 # --- Exemplo de Uso ---
 
-# 1. Defina a mensagem (com maiúsculas, minúsculas e outros caracteres)
-texto_plano = input("Mensagem Secreta OTP, 100% Simetrica.: " )
-print(f"Texto Plano Original: {texto_plano}")
+def exemplo_interativo():
+    # 1. Defina a mensagem (com maiúsculas, minúsculas e outros caracteres)
+    texto_plano = input("Mensagem Secreta OTP, 100% Simetrica.: " )
+    print(f"Texto Plano Original: {texto_plano}")
+
+    # 2. Gere a chave OTP: O tamanho da chave deve ser igual ao NÚMERO DE LETRAS no texto.
+    tamanho_para_chave = sum(1 for char in texto_plano if char.isalpha())
+    chave_otp = gerar_chave_otp_alfabetica(tamanho_para_chave)
 
-# 2. Gere a chave OTP: O tamanho da chave deve ser igual ao NÚMERO DE LETRAS no texto.
-tamanho_para_chave = sum(1 for char in texto_plano if char.isalpha())
-chave_otp = gerar_chave_otp_alfabetica(tamanho_para_chave)
+    print(f"Chave OTP Gerada:     {chave_otp}")
+    print("-" * 50)
 
-print(f"Chave OTP Gerada:     {chave_otp}")
-print("-" * 50)
+    # --- Criptografia ---
+    texto_cifrado = vernam_modular_completo(texto_plano, chave_otp, modo='criptografar')
 
-# --- Criptografia ---
-texto_cifrado = vernam_modular_completo(texto_plano, chave_otp, modo='criptografar')
+    print(f"Texto Cifrado:        {texto_cifrado}")
+    print("-" * 50)
 
-print(f"Texto Cifrado:        {texto_cifrado}")
-print("-" * 50)
+    # --- Descriptografia ---
+    texto_descriptografado = vernam_modular_completo(texto_cifrado, chave_otp, modo='descriptografar')
+    print(f"Texto Descriptografado: {texto_descriptografado}")
 
-# --- Descriptografia ---
-texto_descriptografado = vernam_modular_completo(texto_cifrado, chave_otp, modo='descriptografar')
-print(f"Texto Descriptografado: {texto_descriptografado}")
\ No newline at end of file
+if __name__ == "__main__":
+    exemplo_interativo()
\ No newline at end of file
@@ -1,11 +1,21 @@
-import random # Função aleatória importada para gerar a chave aleatória segura
 import string # Função string importada para compor o alfabeto
 
+import instrumentacao # Tempos por fase e contadores (opcional, desligado por padrão)
+from gerador_chaves import gerar_chave_alfabeto # Gerador de chaves em bloco, sem viés
+
 # --- Configuração do Alfabeto incluindo acentos gráficos e caracteres especiais ---
 alfabeto = string.ascii_letters + string.digits + " ,.:;!?-()ÁÉÍÓÚÀÈÌÒÙÃÕÂÊÎÔÛÇáéíóúàèìòùãõâêîôûç" 
 # o comando string.ascii_letters + string.digits compõe a variável alfabeto de letras e caracteres especiais
 alfabeto_tamanho = len(alfabeto)
 
+# --- Tabelas pré-calculadas (codec do alfabeto) ---
+# Dicionário caractere -> índice: consulta O(1) no lugar de 'in alfabeto' e 'alfabeto.find()'
+indice_alfabeto = {caracter: indice for indice, caracter in enumerate(alfabeto)}
+# Para cada valor de chave K, o alfabeto rotacionado já contém o resultado de (P + K) mod N
+# e de (P - K) mod N na posição P. Assim a cifra vira apenas duas indexações.
+tabela_cripto = [alfabeto[K:] + alfabeto[:K] for K in range(alfabeto_tamanho)]
+tabela_decifrar = [alfabeto[-K:] + alfabeto[:-K] if K else alfabeto for K in range(alfabeto_tamanho)]
+
 """
     Converte um caractere para seu valor numérico (0 até alfabeto_tamanho - 1).
     Aplica-se a qualquer caractere no alfabeto estendido.
@@ -30,56 +40,61 @@ def gerar_chave(tamanho):
     """
     Gera uma chave OTP aleatória e segura usando caracteres do alfabeto.
     """
-    try:
-        chave_segura = random.SystemRandom()
-    except AttributeError:
-        chave_segura = random
-    
-    # Gera a chave com caracteres presentes no alfabeto
-    return ''.join(chave_segura.choice(alfabeto) for _ in range(tamanho))
+    # Gera a chave com caracteres presentes no alfabeto, lendo os.urandom em blocos
+    return gerar_chave_alfabeto(tamanho, alfabeto)
 
 # --- Função processamento ---
 
 def processamento(texto, chave, mode='cripto'):
     """
     Função unificada tanto para cifrar quanto decifrar usando a Cifra de Vernam.
+    Faz uma única passada pelo texto usando as tabelas pré-calculadas.
     """
-    # Filtra apenas caracteres que estão no alfabeto
-    caracteres_texto = [caracter for caracter in texto if caracter in alfabeto]
-    #Atribui um vetor para cada elemento no texto que se encontra na variável alfabeto. Iterando o parâmetro texto e verificando se está contida em alfabeto
-    caracteres_chave = [caracter for caracter in chave if caracter in alfabeto]
-    #Atribui um vetor para cada elemento na chave que se encontra na variável alfabeto. Iterando o parâmetro chave e verificando se está contida em alfabeto
-    
-    # Assegura a condição do Vernam (OTP) : Texto e chave de mesmo tamanho.
-    if len(caracteres_texto) != len(caracteres_chave):
-        raise ValueError(f"ERRO: A chave deve ter o mesmo número de caracteres válidos ({alfabeto_tamanho}) que o texto.")
+    medir = instrumentacao.ATIVA
+    if medir:
+        inicio = instrumentacao.relogio()
+
+    # Converte a chave em índices, ignorando caracteres fora do alfabeto
+    indices_chave = [indice_alfabeto[caracter] for caracter in chave if caracter in indice_alfabeto]
+    #Atribui um vetor com o valor numérico de cada elemento da chave que se encontra no alfabeto
+    total_chave = len(indices_chave)
+
+    # Escolhe a tabela de acordo com o modo: C = (P + K) mod N ou M = (C - K) mod N
+    tabela = tabela_cripto if mode == 'cripto' else tabela_decifrar
+    erro = f"ERRO: A chave deve ter o mesmo número de caracteres válidos ({alfabeto_tamanho}) que o texto."
 
     resultado = list(texto) #Atribui variável resultado que armazena em uma lista 
     indice_chave = 0 #Atribui o índice da chave 0
+    if medir:
+        fim_chave = instrumentacao.relogio()
+        instrumentacao.registrar_tempo('processamento.filtro_chave', fim_chave - inicio)
     
     for i, caracter_texto in enumerate(texto):
+        C_P = indice_alfabeto.get(caracter_texto) # Valor numérico do texto (None se fora do alfabeto)
         
-        if caracter_texto in alfabeto: # Se caracter estiver no alfabeto . Então
-            caracter_chave = caracteres_chave[indice_chave] #Atribui um vetor que recebe a posição dos caracteres da chave
+        if C_P is not None: # Se caracter estiver no alfabeto . Então
+            # Assegura a condição do Vernam (OTP) : Texto e chave de mesmo tamanho.
+            if indice_chave == total_chave:
+                raise ValueError(erro)
             
-            # 2. Mapeamento
-            C_P = letra_num(caracter_texto) # Valor numérico do texto
-            K = letra_num(caracter_chave)   # Valor numérico da chave
-            
-            # 3. Aplica a fórmula modular (agora mod N)
-            if mode == 'cripto': #Testa a condição para criptografia
-                # C = (P + K) mod N
-                M_C = (C_P + K) % alfabeto_tamanho
-            else:
-                # M = (C - K) mod N (Descriptografia)
-                M_C = (C_P - K + alfabeto_tamanho) % alfabeto_tamanho
-            
-            # Converte o resultado para a letra
-            resultado[i] = numero_letra(M_C)
+            # Converte o resultado para a letra: linha K da tabela, coluna P
+            resultado[i] = tabela[indices_chave[indice_chave]][C_P]
             
             indice_chave += 1
-            
-    return "".join(resultado)
+    
+    if indice_chave != total_chave:
+        raise ValueError(erro)
+
+    if not medir:
+        return "".join(resultado)
+
+    fim_laco = instrumentacao.relogio()
+    saida = "".join(resultado)
+    instrumentacao.registrar_tempo('processamento.laco', fim_laco - fim_chave)
+    instrumentacao.registrar_tempo('processamento.juncao', instrumentacao.relogio() - fim_laco)
+    instrumentacao.contar('processamento.caracteres', len(texto))
+    instrumentacao.contar('processamento.ignorados', len(texto) - indice_chave)
+    return saida
 
 # --- Função de Interação do Usuário (Menu) ---
 
@@ -98,7 +113,7 @@ def vernam_interface():
             # --- MODO CIFRAR ---
             texto_original = input("\nDigite a MENSAGEM a ser criptografada: ").strip()
             # O tamanho da chave é baseado em todos os caracteres válidos no alfabeto
-            caracteres_validos = "".join(c for c in texto_original if c in alfabeto)
+            caracteres_validos = "".join(c for c in texto_original if c in indice_alfabeto)
             chave_tamanho = len(caracteres_validos) #Tamanho da chave corresponde ao comprimento de caracteres válidos presentes
             
             if chave_tamanho == 0: #Verifica a condição caso mensagem não contenha caracteres válidos
@@ -120,8 +135,8 @@ def vernam_interface():
             texto_cifrado = input("\nDigite o TEXTO CIFRADO: ").strip()
             chave = input("Digite a CHAVE OTP correspondente: ").strip()
 
-            caracteres_cifrados = "".join(c for c in texto_cifrado if c in alfabeto) #Junta todos elemento na cifra . Iterando o parâmetro texto_cifrado e verificando se está contida em alfabeto 
-            caracteres_chave = "".join(c for c in chave if c in alfabeto) #Junta todos elemento na cifra . Iterando o parâmetro texto_cifrado e verificando se está contida em alfabeto
+            caracteres_cifrados = "".join(c for c in texto_cifrado if c in indice_alfabeto) #Junta todos elemento na cifra . Iterando o parâmetro texto_cifrado e verificando se está contida em alfabeto 
+            caracteres_chave = "".join(c for c in chave if c in indice_alfabeto) #Junta todos elemento na cifra . Iterando o parâmetro texto_cifrado e verificando se está contida em alfabeto
             
             if len(caracteres_cifrados) != len(caracteres_chave): #Testa a condição que garante mesmo comprimento tanto para cifra quanto para a chave
                  raise ValueError("ERRO: O número de caracteres válidos no texto e na chave não coincide. O OTP é inválido.")
@@ -0,0 +1,144 @@
+import collections
+import mmap
+import struct
+
+# --- Contêiner Binário de Cifrados ---
+#
+# Cada registro é um cabeçalho fixo de 32 bytes seguido do cifrado bruto (sem hex):
+#
+#   assinatura  4s  b'VOTP'
+#   versão      B
+#   cifra       B   (CIFRAS)
+#   alfabeto    B   (ALFABETOS)
+#   reservado   B
+#   id do pad   Q
+#   deslocamento do pad  Q
+#   tamanho do cifrado   Q
+#
+# Vários registros podem ficar em sequência no mesmo arquivo. A leitura usa
+# memoryview e struct, então o cifrado nunca é copiado.
+
+ASSINATURA = b'VOTP'
+VERSAO = 1
+CABECALHO = struct.Struct('<4sBBBBQQQ')
+
+# Identificadores gravados no cabeçalho
+CIFRAS = {'xor': 1, 'vernam_modular': 2, 'vernam': 3, 'vernam_ascii': 4, 'cesar': 5}
+ALFABETOS = {'bytes': 0, 'estendido': 1, 'letras': 2, 'cesar': 3}
+NOMES_CIFRAS = {codigo: nome for nome, codigo in CIFRAS.items()}
+NOMES_ALFABETOS = {codigo: nome for nome, codigo in ALFABETOS.items()}
+
+# Alfabeto usado por cada cifra quando não é informado
+ALFABETO_PADRAO = {'xor': 'bytes', 'vernam_modular': 'estendido', 'vernam': 'letras',
+                   'vernam_ascii': 'letras', 'cesar': 'cesar'}
+
+Registro = collections.namedtuple('Registro', 'cifra alfabeto id_pad deslocamento_pad cifrado')
+
+def cabecalho(tamanho, cifra, alfabeto=None, id_pad=0, deslocamento_pad=0):
+    """
+    Monta o cabeçalho de um registro com 'tamanho' bytes de cifrado.
+
+    :raises ValueError: Cifra ou alfabeto desconhecidos.
+    """
+    if cifra not in CIFRAS:
+        raise ValueError(f"Cifra desconhecida: {cifra!r}. Use uma de: {', '.join(CIFRAS)}.")
+    alfabeto = alfabeto or ALFABETO_PADRAO[cifra]
+    if alfabeto not in ALFABETOS:
+        raise ValueError(f"Alfabeto desconhecido: {alfabeto!r}. Use um de: {', '.join(ALFABETOS)}.")
+    return CABECALHO.pack(ASSINATURA, VERSAO, CIFRAS[cifra], ALFABETOS[alfabeto], 0,
+                          id_pad, deslocamento_pad, tamanho)
+
+def como_bytes(cifrado):
+    """Cifrados de texto vão em UTF-8; bytes e buffers vão como estão (sem cópia)."""
+    return cifrado.encode('utf-8') if isinstance(cifrado, str) else memoryview(cifrado).cast('B')
+
+def empacotar(cifrado, cifra, alfabeto=None, id_pad=0, deslocamento_pad=0):
+    """Devolve um registro completo (cabeçalho + cifrado) em bytes."""
+    dados = como_bytes(cifrado)
+    return cabecalho(len(dados), cifra, alfabeto, id_pad, deslocamento_pad) + bytes(dados)
+
+def escrever_registro(arquivo, cifrado, cifra, alfabeto=None, id_pad=0, deslocamento_pad=0):
+    """
+    Grava um registro no fim de um arquivo binário aberto, sem concatenar o
+    cabeçalho e o cifrado em memória.
+
+    :return: Quantidade de bytes gravados.
+    """
+    dados = como_bytes(cifrado)
+    arquivo.write(cabecalho(len(dados), cifra, alfabeto, id_pad, deslocamento_pad))
+    arquivo.write(dados)
+    return CABECALHO.size + len(dados)
+
+def ler_registro(buffer, posicao=0):
+    """
+    Lê o registro que começa em 'posicao' do buffer (bytes, bytearray, mmap...).
+
+    O campo 'cifrado' é uma memoryview do próprio buffer (sem cópia); use
+    bytes(registro.cifrado) ou .tobytes().decode('utf-8') quando precisar de uma cópia.
+
+    :return: Tupla (Registro, posição do próximo registro).
+    :raises ValueError: Assinatura, versão ou identificadores inválidos, ou registro truncado.
+    """
+    visao = buffer if isinstance(buffer, memoryview) else memoryview(buffer)
+    if len(visao) - posicao < CABECALHO.size:
+        raise ValueError("Registro truncado: cabeçalho incompleto.")
+
+    assinatura, versao, cifra, alfabeto, _, id_pad, deslocamento_pad, tamanho = CABECALHO.unpack_from(visao, posicao)
+    if assinatura != ASSINATURA:
+        raise ValueError("Assinatura inválida: não é um registro do contêiner de cifrados.")
+    if versao != VERSAO:
+        raise ValueError(f"Versão do contêiner não suportada: {versao}.")
+    if cifra not in NOMES_CIFRAS or alfabeto not in NOMES_ALFABETOS:
+        raise ValueError("Cifra ou alfabeto desconhecidos no cabeçalho.")
+
+    inicio = posicao + CABECALHO.size
+    fim = inicio + tamanho
+    if fim > len(visao):
+        raise ValueError("Registro truncado: cifrado incompleto.")
+
+    registro = Registro(NOMES_CIFRAS[cifra], NOMES_ALFABETOS[alfabeto], id_pad, deslocamento_pad, visao[inicio:fim])
+    return registro, fim
+
+def iterar_registros(buffer):
+    """Gera todos os registros gravados em sequência no buffer, sem copiar os cifrados."""
+    visao = memoryview(buffer)
+    posicao = 0
+    while posicao < len(visao):
+        registro, posicao = ler_registro(visao, posicao)
+        yield registro
+
+class ConteinerArquivo:
+    """
+    Abre um arquivo de contêiner mapeado em memória para leitura sequencial dos
+    registros, sem carregar o arquivo inteiro.
+
+    Uso:
+        with ConteinerArquivo(caminho) as conteiner:
+            for registro in conteiner:
+                ...
+    As memoryviews dos registros só valem enquanto o contêiner estiver aberto.
+    """
+
+    def __init__(self, caminho):
+        self.arquivo = open(caminho, 'rb')
+        tamanho = self.arquivo.seek(0, 2)
+        self.mapa = mmap.mmap(self.arquivo.fileno(), 0, access=mmap.ACCESS_READ) if tamanho else b''
+
+    def __iter__(self):
+        return iterar_registros(self.mapa)
+
+    def fechar(self):
+        if isinstance(self.mapa, mmap.mmap):
+            try:
+                self.mapa.close()
+            except BufferError:
+                # Ainda há memoryviews de registros em uso: o mapeamento é
+                # desfeito pelo coletor de lixo quando elas forem liberadas
+                pass
+        self.arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
@@ -0,0 +1,385 @@
+import itertools
+import math
+import operator
+import random
+
+try:
+    import numpy as np # Opcional: arrasto de crib vetorizado
+except ImportError:
+    np = None
+
+import cifravernam_otp
+
+# --- Detector de Reuso de Pad ("two-time pad") ---
+#
+# Reusar um pad é o erro fatal do OTP: com C1 = P1 ^ K e C2 = P2 ^ K, temos
+# C1 ^ C2 = P1 ^ P2, e a chave some. O detector evita comparar todos os pares
+# (O(n²)) construindo um índice compacto e só verifica os pares candidatos.
+#
+# XOR (vernam_cipher_xor): em texto ASCII o bit 7 de todo byte é 0, então o bit 7
+# do cifrado é o bit 7 do pad (exceto nos poucos bytes de caracteres acentuados).
+# Cada banda da impressão junta esses bits em posições sorteadas (LSH para distância
+# de Hamming): dois cifrados do mesmo pad coincidem em muitas bandas, enquanto pads
+# independentes só coincidem numa banda inteira por acaso (1 em 2^BITS_POR_BANDA).
+# Como esses encontros por acaso crescem com n², cada par de uma banda passa antes
+# por um filtro barato (distância de Hamming entre as impressões) e só os que
+# sobram viram candidatos.
+#
+# A decisão final é um teste binomial: com pads independentes, cada byte de
+# C1 ^ C2 tem o bit 7 zerado com probabilidade 1/2, então o escore z da contagem
+# de zeros sobre a sobreposição mede a evidência de reuso, qualquer que seja o
+# tamanho dela. As posições da banda em que o par coincidiu ficam fora da conta
+# (nelas a coincidência foi imposta pela busca, não é evidência), e sobreposições
+# curtas demais para decidir são ignoradas.
+#
+# Modular (processamento): C = (P + K) mod N não tem um bit fixo como o XOR, então
+# o índice usa n-gramas posicionais: com o mesmo pad, trechos iguais do texto plano
+# na mesma posição (cabeçalhos, saudações, fórmulas) viram n-gramas cifrados iguais.
+# A verificação usa a taxa de coincidência C1[i] == C2[i] (igual a P1[i] == P2[i]),
+# muito acima de 1/N quando o pad é o mesmo.
+
+# Bits em cada banda da impressão XOR, quantidade de bandas e bytes iniciais usados
+BITS_POR_BANDA = 20
+BANDAS = 48
+COMPRIMENTO_IMPRESSAO = 128
+
+# Posições (sorteadas uma vez, com semente fixa) que formam cada banda, ordenadas
+# pela maior posição para que cifrados curtos ainda usem as primeiras bandas
+_sorteio = random.Random(0)
+POSICOES_BANDAS = sorted(
+    (sorted(_sorteio.sample(range(COMPRIMENTO_IMPRESSAO), BITS_POR_BANDA)) for _ in range(BANDAS)),
+    key=max,
+)
+
+# Baldes maiores que isso viram uma corrente de pares vizinhos (evita explosão quadrática)
+TAMANHO_MAXIMO_BALDE = 64
+
+# Escore z mínimo dos bytes de C1 ^ C2 com o bit 7 zerado para acusar reuso. Um par
+# de pads independentes passa com chance ~1e-9, pouca mesmo com milhões de candidatos
+Z_MINIMO_XOR = 6.0
+
+# Escore z mínimo entre as impressões (até COMPRIMENTO_IMPRESSAO bytes) para o par
+# de uma banda virar candidato; com o mesmo pad ele fica muito acima disso
+Z_FILTRO_XOR = 3.0
+
+# Sobreposição mínima (bytes) para decidir: mesmo com o pad igual e o bit 7 do
+# texto sempre zero, o escore z é sqrt(sobreposição - BITS_POR_BANDA), que precisa
+# passar de Z_MINIMO_XOR com folga para alguns caracteres acentuados
+TAMANHO_MINIMO_XOR = 64
+
+# Taxa de coincidência acima da qual dois cifrados modulares são considerados do mesmo pad
+LIMIAR_COINCIDENCIA = 0.04
+
+# Caracteres considerados plausíveis num trecho de texto plano revelado pelo crib
+CARACTERES_PLAUSIVEIS = frozenset(
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 ,.:;!?-()'\"\n"
+    "áéíóúàâêôãõçÁÉÍÓÚÀÂÊÔÃÕÇ"
+)
+BYTES_PLAUSIVEIS = bytes(sorted(ord(c) for c in CARACTERES_PLAUSIVEIS if ord(c) < 0x80))
+
+# bytes.translate: cada byte vira o caractere '0' ou '1' do seu bit 7
+TABELA_BIT7 = bytes(ord('1') if b & 0x80 else ord('0') for b in range(256))
+
+# --- Índice ---
+
+def pares_dos_baldes(baldes):
+    """Gera os pares candidatos de cada balde com mais de um cifrado."""
+    for membros in baldes:
+        if len(membros) < 2:
+            continue
+        if len(membros) <= TAMANHO_MAXIMO_BALDE:
+            yield from itertools.combinations(membros, 2)
+        else:
+            yield from zip(membros, membros[1:])
+
+def impressao_xor(cifrado):
+    """
+    Impressão de um cifrado XOR: os bits 7 dos primeiros COMPRIMENTO_IMPRESSAO
+    bytes, como bytes b'0'/b'1' (no máximo 128 bytes por cifrado).
+    """
+    return bytes(cifrado[:COMPRIMENTO_IMPRESSAO]).translate(TABELA_BIT7)
+
+def chave_banda(impressao, banda):
+    """
+    Chave da banda (inteiro de BITS_POR_BANDA bits com os bits da impressão nas
+    posições da banda), ou None se o cifrado for curto demais para ela.
+    """
+    posicoes = POSICOES_BANDAS[banda]
+    if posicoes[-1] >= len(impressao):
+        return None
+    return int(bytes(operator.itemgetter(*posicoes)(impressao)), 2)
+
+# Cifrados convertidos por vez na matriz de bits (limita a memória temporária)
+BLOCO_IMPRESSOES = 1 << 16
+
+def matriz_impressoes(cifrados):
+    """
+    Impressões de todos os cifrados numa matriz NumPy compacta (n x 16 bytes, um
+    bit por posição) e o comprimento de cada impressão.
+    """
+    partes = []
+    comprimentos = np.fromiter((min(len(c), COMPRIMENTO_IMPRESSAO) for c in cifrados),
+                               dtype=np.int64, count=len(cifrados))
+    for inicio in range(0, len(cifrados), BLOCO_IMPRESSOES):
+        bloco = b''.join(bytes(c[:COMPRIMENTO_IMPRESSAO]).ljust(COMPRIMENTO_IMPRESSAO, b'\0')
+                         for c in cifrados[inicio:inicio + BLOCO_IMPRESSOES])
+        bits = np.frombuffer(bloco, dtype=np.uint8).reshape(-1, COMPRIMENTO_IMPRESSAO) >> 7
+        partes.append(np.packbits(bits, axis=1))
+    if not partes:
+        return np.zeros((0, COMPRIMENTO_IMPRESSAO // 8), dtype=np.uint8), comprimentos
+    return np.concatenate(partes), comprimentos
+
+def chaves_banda_numpy(matriz, banda):
+    """Chaves da banda para todas as linhas da matriz de impressões (uint32)."""
+    chaves = np.zeros(len(matriz), dtype=np.uint32)
+    for bit, posicao in enumerate(POSICOES_BANDAS[banda]):
+        coluna = (matriz[:, posicao >> 3] >> (7 - (posicao & 7))) & 1
+        chaves |= coluna.astype(np.uint32) << np.uint32(bit)
+    return chaves
+
+def pares_banda_numpy(chaves, indices):
+    """
+    Mesmos pares de 'pares_dos_baldes' para os grupos de chaves iguais, como dois
+    vetores (i, j) com i < j, sem montar os grupos em Python.
+    """
+    ordem = np.argsort(chaves, kind='stable')
+    ordenadas = chaves[ordem]
+    membros = indices[ordem]  # Dentro de um grupo, em ordem crescente de índice
+    novo = np.concatenate(([True], ordenadas[1:] != ordenadas[:-1]))
+    inicios = np.flatnonzero(novo)
+    fins = np.append(inicios[1:], len(ordenadas))
+    grupo = np.cumsum(novo) - 1
+    fim = fins[grupo]
+    pequeno = (fins - inicios)[grupo] <= TAMANHO_MAXIMO_BALDE
+
+    # Par de cada posição com a k-ésima seguinte do mesmo grupo (só k = 1 nos grupos grandes)
+    pares_i, pares_j = [membros[:0]], [membros[:0]]
+    posicoes = np.arange(len(ordenadas))
+    k = 1
+    while len(posicoes):
+        posicoes = posicoes[posicoes + k < fim[posicoes]]
+        if k > 1:
+            posicoes = posicoes[pequeno[posicoes]]
+        pares_i.append(membros[posicoes])
+        pares_j.append(membros[posicoes + k])
+        k += 1
+    return np.concatenate(pares_i), np.concatenate(pares_j)
+
+def escore_z(acertos, tamanho):
+    """Escore z de 'acertos' em 'tamanho' tentativas com probabilidade 1/2 cada."""
+    return (2 * acertos - tamanho) / math.sqrt(tamanho)
+
+def impressoes_proximas(impressao1, impressao2, banda, z_filtro):
+    """
+    Se as impressões (b'0'/b'1') de dois cifrados que coincidem na banda também
+    coincidem bem acima do acaso no resto da parte comum. As posições da banda
+    ficam de fora, pois nelas a coincidência já é certa.
+    """
+    tamanho = min(len(impressao1), len(impressao2))
+    fora_da_banda = sum(1 << (tamanho - 1 - posicao) for posicao in POSICOES_BANDAS[banda])
+    diferenca = (int(impressao1[:tamanho], 2) ^ int(impressao2[:tamanho], 2)) & ~fora_da_banda
+    restantes = tamanho - BITS_POR_BANDA
+    return restantes > 0 and escore_z(restantes - bin(diferenca).count('1'), restantes) >= z_filtro
+
+def filtrar_pares_numpy(matriz, comprimentos, pares_i, pares_j, banda, z_filtro):
+    """Versão vetorizada de 'impressoes_proximas' para vetores de pares."""
+    # Máscara de bits de cada comprimento comum, sem as posições da banda
+    posicoes = np.arange(COMPRIMENTO_IMPRESSAO)
+    mascaras = np.packbits((posicoes < np.arange(COMPRIMENTO_IMPRESSAO + 1)[:, None])
+                           & ~np.isin(posicoes, POSICOES_BANDAS[banda]), axis=1)
+    bits_por_byte = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1, dtype=np.int64)
+
+    mascara = mascaras[np.minimum(comprimentos[pares_i], comprimentos[pares_j])]
+    restantes = bits_por_byte[mascara].sum(axis=1)
+    distancia = bits_por_byte[(matriz[pares_i] ^ matriz[pares_j]) & mascara].sum(axis=1)
+    manter = (restantes > 0) & ((restantes - 2 * distancia) >= z_filtro * np.sqrt(restantes))
+    return pares_i[manter], pares_j[manter]
+
+def bandas_candidatos_xor(cifrados, tamanho_minimo=TAMANHO_MINIMO_XOR, z_filtro=Z_FILTRO_XOR):
+    """
+    Pares (i, j) de cifrados XOR que coincidem em pelo menos uma banda da impressão
+    e cujas impressões, fora dessa banda, estão próximas (escore z >= z_filtro).
+    Cifrados com menos de 'tamanho_minimo' bytes ficam de fora.
+
+    Só a impressão de cada cifrado fica em memória (16 bytes com NumPy, até 128
+    sem); os pares de cada banda são filtrados na passada daquela banda, então só
+    os que passam pelo filtro chegam ao dicionário de candidatos.
+
+    :return: Dicionário {(i, j): primeira banda em que o par coincidiu}.
+    """
+    if np is not None:
+        matriz, comprimentos = matriz_impressoes(cifrados)
+        longos = np.fromiter((len(c) >= tamanho_minimo for c in cifrados), dtype=bool, count=len(cifrados))
+    else:
+        impressoes = [impressao_xor(c) if len(c) >= tamanho_minimo else b'' for c in cifrados]
+
+    candidatos = {}
+    for banda in range(BANDAS):
+        if np is not None:
+            indices = np.flatnonzero(longos & (comprimentos > POSICOES_BANDAS[banda][-1]))
+            pares_i, pares_j = pares_banda_numpy(chaves_banda_numpy(matriz[indices], banda), indices)
+            pares_i, pares_j = filtrar_pares_numpy(matriz, comprimentos, pares_i, pares_j, banda, z_filtro)
+            pares = zip(pares_i.tolist(), pares_j.tolist())
+        else:
+            grupos = {}
+            for indice, impressao in enumerate(impressoes):
+                chave = chave_banda(impressao, banda)
+                if chave is not None:
+                    grupos.setdefault(chave, []).append(indice)
+            pares = ((i, j) for i, j in pares_dos_baldes(grupos.values())
+                     if impressoes_proximas(impressoes[i], impressoes[j], banda, z_filtro))
+        for par in pares:
+            candidatos.setdefault(par, banda)
+    return candidatos
+
+def candidatos_xor(cifrados, tamanho_minimo=TAMANHO_MINIMO_XOR, z_filtro=Z_FILTRO_XOR):
+    """Pares (i, j) candidatos de 'bandas_candidatos_xor', em ordem."""
+    return sorted(bandas_candidatos_xor(cifrados, tamanho_minimo, z_filtro))
+
+def indices_modulares(cifrado, indice_alfabeto):
+    """Sequência de índices do cifrado, só com os caracteres que consomem chave."""
+    return [indice_alfabeto[c] for c in cifrado if c in indice_alfabeto]
+
+def candidatos_modulares(sequencias, n=4, comprimento=64):
+    """
+    Pares (i, j) de cifrados modulares com o mesmo n-grama na mesma posição,
+    entre as 'comprimento' primeiras posições. Processa uma posição por vez.
+    """
+    candidatos = set()
+    for posicao in range(comprimento):
+        baldes = {}
+        for indice, sequencia in enumerate(sequencias):
+            ngrama = sequencia[posicao:posicao + n]
+            if len(ngrama) == n:
+                baldes.setdefault(tuple(ngrama), []).append(indice)
+        candidatos.update(pares_dos_baldes(baldes.values()))
+    return sorted(candidatos)
+
+# --- Verificação ---
+
+def zeros_bit7_xor(cifrado1, cifrado2, ignorar=()):
+    """
+    Tupla (bytes de C1 ^ C2 com o bit 7 zerado, bytes contados) sobre a
+    sobreposição, sem contar as posições em 'ignorar'.
+    """
+    tamanho = min(len(cifrado1), len(cifrado2))
+    if tamanho == 0:
+        return 0, 0
+    diferenca = (int.from_bytes(bytes(cifrado1[:tamanho]), 'big') ^ int.from_bytes(bytes(cifrado2[:tamanho]), 'big'))
+    bits = diferenca.to_bytes(tamanho, 'big').translate(TABELA_BIT7)
+    ignorar = [posicao for posicao in ignorar if posicao < tamanho]
+    altos = bits.count(b'1') - sum(bits[posicao] == ord('1') for posicao in ignorar)
+    contados = tamanho - len(ignorar)
+    return contados - altos, contados
+
+def pontuacao_xor(cifrado1, cifrado2):
+    """Fração dos bytes de C1 ^ C2 com o bit 7 zerado (≈0,5 com pads independentes)."""
+    zeros, tamanho = zeros_bit7_xor(cifrado1, cifrado2)
+    return zeros / tamanho if tamanho else 0.0
+
+def coincidencia(sequencia1, sequencia2):
+    """Fração das posições com o mesmo índice cifrado (≈1/N com pads independentes)."""
+    tamanho = min(len(sequencia1), len(sequencia2))
+    if tamanho == 0:
+        return 0.0
+    return sum(a == b for a, b in zip(sequencia1, sequencia2)) / tamanho
+
+def detectar_reuso_xor(cifrados, z_minimo=Z_MINIMO_XOR, tamanho_minimo=TAMANHO_MINIMO_XOR):
+    """
+    Procura pares de cifrados XOR que provavelmente usaram o mesmo pad.
+
+    :param cifrados: Lista de cifrados (bytes) alinhados pelo início do pad.
+    :param z_minimo: Escore z (binomial, sobre a sobreposição fora da banda que
+                     revelou o par) a partir do qual há reuso.
+    :param tamanho_minimo: Sobreposição mínima, em bytes, para decidir.
+    :return: Lista de (i, j, pontuação), sendo a pontuação a fração de bytes
+             contados de C1 ^ C2 com o bit 7 zerado.
+    """
+    suspeitos = []
+    for (i, j), banda in sorted(bandas_candidatos_xor(cifrados, tamanho_minimo).items()):
+        zeros, contados = zeros_bit7_xor(cifrados[i], cifrados[j], POSICOES_BANDAS[banda])
+        if contados > 0 and escore_z(zeros, contados) >= z_minimo:
+            suspeitos.append((i, j, zeros / contados))
+    return suspeitos
+
+def detectar_reuso_modular(cifrados, limiar=LIMIAR_COINCIDENCIA, alfabeto=cifravernam_otp.alfabeto,
+                           n=4, comprimento=64):
+    """
+    Procura pares de cifrados da cifra modular ('processamento') que provavelmente
+    usaram o mesmo pad.
+
+    :return: Lista de (i, j, taxa de coincidência) com taxa >= limiar.
+    """
+    indice_alfabeto = {caracter: indice for indice, caracter in enumerate(alfabeto)}
+    sequencias = [indices_modulares(c, indice_alfabeto) for c in cifrados]
+    suspeitos = []
+    for i, j in candidatos_modulares(sequencias, n, comprimento):
+        taxa = coincidencia(sequencias[i], sequencias[j])
+        if taxa >= limiar:
+            suspeitos.append((i, j, taxa))
+    return suspeitos
+
+# --- Arrasto de Crib ---
+
+def arrastar_crib_xor(cifrado1, cifrado2, crib):
+    """
+    Arrasta um trecho provável do texto plano (crib) sobre C1 ^ C2.
+
+    Em cada posição p, supondo P1[p:p+m] == crib, o outro texto seria
+    P2[p:p+m] = (C1 ^ C2)[p:p+m] ^ crib. Devolve as posições em que esse
+    trecho só tem caracteres plausíveis, com o trecho revelado.
+    """
+    crib = crib.encode('utf-8') if isinstance(crib, str) else bytes(crib)
+    tamanho = min(len(cifrado1), len(cifrado2))
+    m = len(crib)
+    if m == 0 or tamanho < m:
+        return []
+
+    if np is not None:
+        diferenca = np.bitwise_xor(np.frombuffer(cifrado1, np.uint8, tamanho), np.frombuffer(cifrado2, np.uint8, tamanho))
+        janelas = np.lib.stride_tricks.sliding_window_view(diferenca, m) ^ np.frombuffer(crib, np.uint8)
+        plausiveis = np.zeros(256, dtype=bool)
+        plausiveis[np.frombuffer(BYTES_PLAUSIVEIS, np.uint8)] = True
+        posicoes = np.flatnonzero(plausiveis[janelas].all(axis=1))
+        return [(int(p), janelas[p].tobytes().decode('ascii')) for p in posicoes]
+
+    diferenca = bytes(a ^ b for a, b in zip(cifrado1[:tamanho], cifrado2[:tamanho]))
+    resultado = []
+    for p in range(tamanho - m + 1):
+        trecho = bytes(a ^ b for a, b in zip(diferenca[p:p + m], crib))
+        if not trecho.translate(None, BYTES_PLAUSIVEIS):
+            resultado.append((p, trecho.decode('ascii')))
+    return resultado
+
+def arrastar_crib_modular(cifrado1, cifrado2, crib, alfabeto=cifravernam_otp.alfabeto):
+    """
+    Arrasta um crib sobre dois cifrados modulares do mesmo pad.
+
+    Com D = C1 - C2 = P1 - P2 (mod N), supondo P1[p:p+m] == crib, o outro texto
+    seria P2 = crib - D (mod N). As posições são contadas em caracteres do alfabeto.
+    """
+    N = len(alfabeto)
+    indice_alfabeto = {caracter: indice for indice, caracter in enumerate(alfabeto)}
+    sequencia1 = indices_modulares(cifrado1, indice_alfabeto)
+    sequencia2 = indices_modulares(cifrado2, indice_alfabeto)
+    valores_crib = indices_modulares(crib, indice_alfabeto)
+    tamanho = min(len(sequencia1), len(sequencia2))
+    m = len(valores_crib)
+    if m == 0 or tamanho < m:
+        return []
+
+    plausiveis = [caracter in CARACTERES_PLAUSIVEIS for caracter in alfabeto]
+
+    if np is not None:
+        diferenca = (np.array(sequencia1[:tamanho]) - np.array(sequencia2[:tamanho])) % N
+        janelas = (np.array(valores_crib) - np.lib.stride_tricks.sliding_window_view(diferenca, m)) % N
+        posicoes = np.flatnonzero(np.array(plausiveis)[janelas].all(axis=1))
+        return [(int(p), "".join(alfabeto[v] for v in janelas[p])) for p in posicoes]
+
+    diferenca = [(a - b) % N for a, b in zip(sequencia1, sequencia2)]
+    resultado = []
+    for p in range(tamanho - m + 1):
+        trecho = [(c - d) % N for c, d in zip(valores_crib, diferenca[p:p + m])]
+        if all(plausiveis[v] for v in trecho):
+            resultado.append((p, "".join(alfabeto[v] for v in trecho)))
+    return resultado
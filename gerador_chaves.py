@@ -0,0 +1,59 @@
+import functools
+import os
+
+import instrumentacao
+
+# --- Gerador de Chaves OTP sobre um Alfabeto ---
+
+# Quantidade máxima de bytes lidos de 'os.urandom' por chamada.
+TAMANHO_BLOCO_ENTROPIA = 1 << 20
+
+@functools.lru_cache(maxsize=16)
+def tabelas_amostragem(alfabeto):
+    """
+    Monta (uma vez por alfabeto) as tabelas da amostragem por rejeição.
+
+    Um byte aleatório b só é aceito se b < limite, onde limite é o maior múltiplo
+    de N que cabe em 256; assim b % N é uniforme (sem viés) no intervalo 0..N-1.
+
+    :return: Tupla (tabela de bytes b -> b % N, bytes rejeitados, tabela índice -> caractere, limite).
+    """
+    N = len(alfabeto)
+    if not 0 < N <= 256:
+        raise ValueError("O alfabeto deve ter entre 1 e 256 caracteres.")
+
+    limite = 256 - (256 % N)
+    tabela_indices = bytes(b % N if b < limite else 0 for b in range(256))
+    rejeitados = bytes(range(limite, 256))
+    # Os índices viram caracteres latin-1 (chr(0)..chr(N-1)) e depois o caractere do alfabeto
+    tabela_caracteres = str.maketrans({indice: caracter for indice, caracter in enumerate(alfabeto)})
+    return tabela_indices, rejeitados, tabela_caracteres, limite
+
+def gerar_chave_alfabeto(tamanho, alfabeto):
+    """
+    Gera uma chave OTP aleatória e segura com 'tamanho' caracteres do alfabeto.
+
+    Lê 'os.urandom' em blocos grandes (em vez de uma chamada por caractere) e
+    converte os bytes em caracteres por amostragem por rejeição, sem viés.
+    Todo o mapeamento é feito em C por 'bytes.translate' e 'str.translate'.
+    Funciona para qualquer alfabeto de 1 a 256 caracteres (26, 52, ~100...).
+    """
+    if tamanho < 0:
+        raise ValueError("O tamanho da chave não pode ser negativo.")
+
+    tabela_indices, rejeitados, tabela_caracteres, limite = tabelas_amostragem(alfabeto)
+
+    partes = []
+    faltam = tamanho
+    while faltam > 0:
+        # Lê um pouco a mais que o esperado para compensar os bytes rejeitados
+        pedido = min(faltam * 256 // limite + 64, TAMANHO_BLOCO_ENTROPIA)
+        if instrumentacao.ATIVA:
+            instrumentacao.contar('chave.bytes_aleatorios', pedido)
+        indices = os.urandom(pedido).translate(tabela_indices, rejeitados)[:faltam]
+        partes.append(indices.decode('latin-1').translate(tabela_caracteres))
+        faltam -= len(indices)
+
+    if instrumentacao.ATIVA:
+        instrumentacao.contar('chave.caracteres', tamanho)
+    return "".join(partes)
@@ -0,0 +1,232 @@
+import codecs
+import collections
+import struct
+
+import cifravernam_otp
+import conteiner_cifras
+import vernam_cifrar_decifrar
+
+# --- Índice de Pontos de Retomada (decifrar trechos sem ler desde o início) ---
+#
+# Nas cifras modulares o caractere i do texto usa a chave na posição "quantos
+# caracteres válidos existem antes de i", então decifrar um trecho exige contar
+# tudo o que vem antes. O índice guarda, a cada 'intervalo' caracteres do texto,
+# onde se está no texto e na chave (em caracteres e em bytes UTF-8). Um trecho é
+# decifrado a partir do ponto anterior ao seu início: no máximo 'intervalo'
+# caracteres extras, qualquer que seja o tamanho do documento.
+#
+# As duas cifras decidem o caso de cada letra pelo próprio caractere (não há
+# estado de caso carregado entre posições), então cada ponto só precisa das
+# quatro posições. O índice é construído a partir do cifrado, pois as posições
+# em bytes se referem ao arquivo cifrado (um caractere acentuado pode virar uma
+# letra ASCII, e vice-versa, mudando o tamanho em UTF-8).
+#
+# O arquivo do índice ("sidecar") é um cabeçalho de 32 bytes seguido dos pontos:
+#
+#   assinatura  4s  b'VIDX'
+#   versão      B
+#   cifra       B   (conteiner_cifras.CIFRAS)
+#   reservado   H
+#   intervalo   Q
+#   total de caracteres do texto  Q
+#   quantidade de pontos          Q
+#
+# e cada ponto são quatro Q: caractere, byte do texto, caractere da chave, byte da chave.
+
+ASSINATURA = b'VIDX'
+VERSAO = 1
+CABECALHO = struct.Struct('<4sBBHQQQ')
+
+# Caracteres do texto entre dois pontos do índice
+INTERVALO_PADRAO = 4096
+
+Ponto = collections.namedtuple('Ponto', 'caractere byte_texto chave byte_chave')
+
+# Remove os caracteres do alfabeto de 'processamento': len(antes) - len(depois) = válidos
+_TABELA_ALFABETO = dict.fromkeys(map(ord, cifravernam_otp.alfabeto))
+
+def contar_validos_modular(trecho):
+    """Quantos caracteres do trecho consomem chave em 'processamento'."""
+    return len(trecho) - len(trecho.translate(_TABELA_ALFABETO))
+
+def contar_validos_letras(trecho):
+    """Quantos caracteres do trecho consomem chave em 'vernam_cipher' (letras)."""
+    return sum(map(str.isalpha, trecho))
+
+def _processamento(texto, chave, modo):
+    return cifravernam_otp.processamento(texto, chave, mode='cripto' if modo == 'cifrar' else 'decifrar')
+
+# Para cada cifra: função que conta os caracteres válidos e função (texto, chave, modo)
+CIFRAS = {
+    'vernam_modular': (contar_validos_modular, _processamento),
+    'vernam': (contar_validos_letras, vernam_cifrar_decifrar.vernam_cipher),
+}
+
+def funcoes_cifra(cifra):
+    """
+    Par (contar válidos, cifrar) da cifra.
+
+    :raises ValueError: Cifra sem suporte ao índice.
+    """
+    if cifra not in CIFRAS:
+        raise ValueError(f"Cifra sem suporte ao índice: {cifra!r}. Use uma de: {', '.join(CIFRAS)}.")
+    return CIFRAS[cifra]
+
+def avancar_chave(chave, posicao, quantidade, contar):
+    """
+    Posição da chave depois de consumir 'quantidade' caracteres válidos a partir de
+    'posicao'. Com chaves geradas só com caracteres válidos, é uma única fatia.
+    """
+    while quantidade > 0:
+        if posicao >= len(chave):
+            raise ValueError("A chave tem menos caracteres válidos que o texto.")
+        pedaco = chave[posicao:posicao + quantidade]
+        quantidade -= contar(pedaco)
+        posicao += len(pedaco)
+    return posicao
+
+class IndiceTrechos:
+    """
+    Pontos de retomada de um texto cifrado com 'processamento' ('vernam_modular')
+    ou 'vernam_cipher' ('vernam'). O ponto k descreve o caractere k * intervalo.
+    """
+
+    def __init__(self, cifra, intervalo, total, pontos):
+        funcoes_cifra(cifra)
+        self.cifra = cifra
+        self.intervalo = intervalo
+        self.total = total
+        self.pontos = pontos
+
+    @classmethod
+    def construir(cls, cifrado, chave, cifra='vernam_modular', intervalo=INTERVALO_PADRAO):
+        """
+        Percorre cifrado e chave uma vez, em pedaços de 'intervalo' caracteres,
+        anotando um ponto no início de cada pedaço.
+        """
+        if intervalo <= 0:
+            raise ValueError("O intervalo do índice deve ser positivo.")
+        contar = funcoes_cifra(cifra)[0]
+        pontos = []
+        byte_texto = posicao_chave = byte_chave = 0
+        for inicio in range(0, len(cifrado), intervalo):
+            pontos.append(Ponto(inicio, byte_texto, posicao_chave, byte_chave))
+            pedaco = cifrado[inicio:inicio + intervalo]
+            proxima = avancar_chave(chave, posicao_chave, contar(pedaco), contar)
+            byte_texto += len(pedaco.encode('utf-8'))
+            byte_chave += len(chave[posicao_chave:proxima].encode('utf-8'))
+            posicao_chave = proxima
+        return cls(cifra, intervalo, len(cifrado), pontos)
+
+    def ponto_anterior(self, posicao):
+        """Último ponto em ou antes do caractere 'posicao' do texto."""
+        if not 0 <= posicao <= self.total:
+            raise ValueError("Posição fora do texto indexado.")
+        return self.pontos[min(posicao // self.intervalo, len(self.pontos) - 1)] if self.pontos else Ponto(0, 0, 0, 0)
+
+    # --- Arquivo do índice ---
+
+    def gravar(self, caminho):
+        """Grava o índice no arquivo 'caminho' (formato descrito no topo do módulo)."""
+        valores = [valor for ponto in self.pontos for valor in ponto]
+        with open(caminho, 'wb') as arquivo:
+            arquivo.write(CABECALHO.pack(ASSINATURA, VERSAO, conteiner_cifras.CIFRAS[self.cifra], 0,
+                                         self.intervalo, self.total, len(self.pontos)))
+            arquivo.write(struct.pack(f'<{len(valores)}Q', *valores))
+
+    @classmethod
+    def ler(cls, caminho):
+        """
+        Lê um índice gravado com 'gravar'.
+
+        :raises ValueError: Assinatura, versão ou cifra inválidas, ou arquivo truncado.
+        """
+        with open(caminho, 'rb') as arquivo:
+            dados = arquivo.read()
+        if len(dados) < CABECALHO.size:
+            raise ValueError("Índice truncado: cabeçalho incompleto.")
+        assinatura, versao, cifra, _, intervalo, total, quantidade = CABECALHO.unpack_from(dados)
+        if assinatura != ASSINATURA:
+            raise ValueError("Assinatura inválida: não é um arquivo de índice de trechos.")
+        if versao != VERSAO:
+            raise ValueError(f"Versão do índice não suportada: {versao}.")
+        if conteiner_cifras.NOMES_CIFRAS.get(cifra) not in CIFRAS:
+            raise ValueError("Cifra desconhecida no cabeçalho do índice.")
+        if len(dados) != CABECALHO.size + quantidade * 32:
+            raise ValueError("Índice truncado: pontos incompletos.")
+        valores = struct.unpack_from(f'<{quantidade * 4}Q', dados, CABECALHO.size)
+        pontos = [Ponto(*valores[i:i + 4]) for i in range(0, len(valores), 4)]
+        return cls(conteiner_cifras.NOMES_CIFRAS[cifra], intervalo, total, pontos)
+
+def cifrar_com_indice(texto, chave, cifra='vernam_modular', intervalo=INTERVALO_PADRAO):
+    """
+    Cifra o texto inteiro e constrói o índice de pontos de retomada.
+
+    :return: Tupla (cifrado, IndiceTrechos).
+    """
+    cifrado = funcoes_cifra(cifra)[1](texto, chave, 'cifrar')
+    return cifrado, IndiceTrechos.construir(cifrado, chave, cifra, intervalo)
+
+def decifrar_desde_ponto(texto, chave, posicao_chave, deslocamento, cifra):
+    """
+    Decifra texto[deslocamento:], sendo que 'texto' começa num ponto do índice cuja
+    chave começa em 'posicao_chave'. Os caracteres antes do deslocamento só são contados.
+    """
+    contar, funcao = funcoes_cifra(cifra)
+    inicio_chave = avancar_chave(chave, posicao_chave, contar(texto[:deslocamento]), contar)
+    trecho = texto[deslocamento:]
+    fim_chave = avancar_chave(chave, inicio_chave, contar(trecho), contar)
+    return funcao(trecho, chave[inicio_chave:fim_chave], 'decifrar')
+
+def decifrar_trecho(cifrado, chave, inicio, fim, indice):
+    """
+    Decifra só os caracteres [inicio, fim) do cifrado, com custo proporcional ao
+    trecho (mais no máximo 'indice.intervalo' caracteres até o ponto anterior).
+
+    :param cifrado: Texto cifrado completo (str).
+    :param chave: Chave completa usada na cifragem.
+    :return: Texto plano do trecho.
+    """
+    if not 0 <= inicio <= fim <= indice.total:
+        raise ValueError("Trecho fora do texto indexado.")
+    ponto = indice.ponto_anterior(inicio)
+    return decifrar_desde_ponto(cifrado[ponto.caractere:fim], chave, ponto.chave,
+                                inicio - ponto.caractere, indice.cifra)
+
+def ler_caracteres(arquivo, byte, quantidade, contar=len):
+    """
+    Lê caracteres UTF-8 de um arquivo binário a partir do byte 'byte' até ter
+    'quantidade' caracteres segundo 'contar' (ou até o fim do arquivo). Com
+    'contar' diferente de len, o texto pode passar um pouco da quantidade.
+    """
+    arquivo.seek(byte)
+    decodificador = codecs.getincrementaldecoder('utf-8')()
+    partes = []
+    faltam = quantidade
+    while faltam > 0:
+        dados = arquivo.read(faltam * 4)  # Um caractere UTF-8 tem no máximo 4 bytes
+        if not dados:
+            break
+        texto = decodificador.decode(dados)
+        if contar is len:
+            texto = texto[:faltam]
+        partes.append(texto)
+        faltam -= contar(texto)
+    return "".join(partes)
+
+def decifrar_trecho_arquivo(caminho_cifrado, caminho_chave, inicio, fim, indice):
+    """
+    Versão de 'decifrar_trecho' para cifrado e chave gravados em arquivos UTF-8:
+    lê só a partir dos bytes do ponto anterior ao trecho, sem carregar os arquivos.
+    """
+    if not 0 <= inicio <= fim <= indice.total:
+        raise ValueError("Trecho fora do texto indexado.")
+    ponto = indice.ponto_anterior(inicio)
+    contar = funcoes_cifra(indice.cifra)[0]
+
+    with open(caminho_cifrado, 'rb') as arquivo:
+        cifrado = ler_caracteres(arquivo, ponto.byte_texto, fim - ponto.caractere)
+    with open(caminho_chave, 'rb') as arquivo:
+        chave = ler_caracteres(arquivo, ponto.byte_chave, contar(cifrado), contar)
+
+    return decifrar_desde_ponto(cifrado, chave, 0, inicio - ponto.caractere, indice.cifra)
@@ -0,0 +1,84 @@
+import collections
+import json
+import marshal
+import threading
+import time
+
+# --- Instrumentação Opcional das Cifras ---
+#
+# As funções das cifras consultam ATIVA apenas nas fronteiras de cada fase
+# (algumas vezes por chamada, nunca por caractere). Desativada, a instrumentação
+# custa só essa leitura de variável; ativada, acumula o tempo de cada fase e
+# contadores como caracteres processados, ignorados e bytes de XOR.
+#
+# Uso:
+#     instrumentacao.ativar()
+#     ... chama as cifras ...
+#     print(instrumentacao.snapshot())
+#     instrumentacao.exportar_pstats('cifras.prof')  # python -m pstats cifras.prof
+
+ATIVA = False
+
+# Relógio usado para medir as fases
+relogio = time.perf_counter
+
+_trava = threading.Lock()
+_tempos = collections.defaultdict(float)
+_chamadas = collections.Counter()
+_contadores = collections.Counter()
+
+def ativar():
+    """Liga a coleta de tempos e contadores."""
+    global ATIVA
+    ATIVA = True
+
+def desativar():
+    """Desliga a coleta (os valores acumulados são mantidos até 'reset')."""
+    global ATIVA
+    ATIVA = False
+
+def registrar_tempo(fase, segundos):
+    """Soma 'segundos' ao tempo da fase (ex.: 'processamento.laco') e conta uma chamada."""
+    with _trava:
+        _tempos[fase] += segundos
+        _chamadas[fase] += 1
+
+def contar(nome, quantidade=1):
+    """Soma 'quantidade' ao contador 'nome' (ex.: 'xor.bytes')."""
+    with _trava:
+        _contadores[nome] += quantidade
+
+def snapshot():
+    """Cópia dos valores acumulados: {'fases': {fase: {'segundos', 'chamadas'}}, 'contadores': {...}}."""
+    with _trava:
+        return {
+            'fases': {fase: {'segundos': _tempos[fase], 'chamadas': _chamadas[fase]} for fase in sorted(_tempos)},
+            'contadores': dict(sorted(_contadores.items())),
+        }
+
+def reset():
+    """Zera todos os tempos e contadores."""
+    with _trava:
+        _tempos.clear()
+        _chamadas.clear()
+        _contadores.clear()
+
+def exportar_json(caminho):
+    """Grava o snapshot atual em JSON."""
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(snapshot(), arquivo, indent=2, ensure_ascii=False)
+
+def exportar_pstats(caminho):
+    """
+    Grava as fases no formato de estatísticas do cProfile (marshal), para leitura
+    com pstats.Stats(caminho) ou 'python -m pstats'. Cada fase aparece como uma
+    "função" ('cifra', 0, 'fase') com o número de chamadas e o tempo total.
+    """
+    estatisticas = {}
+    with _trava:
+        for fase, segundos in _tempos.items():
+            cifra, _, nome = fase.rpartition('.')
+            chamadas = _chamadas[fase]
+            estatisticas[(cifra or fase, 0, nome)] = (chamadas, chamadas, segundos, segundos, {})
+    with open(caminho, 'wb') as arquivo:
+        marshal.dump(estatisticas, arquivo)
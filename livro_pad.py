@@ -0,0 +1,229 @@
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+try:
+    import fcntl # Trava de arquivo entre processos (POSIX)
+except ImportError:
+    fcntl = None
+    import msvcrt # Windows
+
+# --- Livro de Reservas do Pad (vários processos, um arquivo de pad) ---
+#
+# Com um único arquivo de pad compartilhado, dois processos que escolhem o
+# deslocamento por conta própria podem usar os mesmos bytes, o que quebra o OTP.
+# O livro é um arquivo pequeno ao lado do pad, mapeado em memória, que guarda a
+# "marca d'água": todo byte do pad antes dela já foi entregue a alguém.
+#
+# Cada processo reserva um lote inteiro (tamanho_lote bytes) de uma vez: trava o
+# livro, avança a marca, grava no disco e destrava. As mensagens saem desse lote
+# sem passar pela trava, então ela é disputada uma vez por lote, não por mensagem.
+#
+# Tolerância a falhas: a marca é gravada no disco antes de qualquer byte do lote
+# ser entregue. Se o processo cair, o resto do lote é perdido, mas nunca reusado.
+# A marca fica em dois espaços com número de sequência e CRC32, gravados
+# alternadamente; uma gravação interrompida estraga só um deles e a leitura usa o
+# espaço válido de maior sequência.
+#
+#   assinatura  4s  b'VLED'
+#   versão      B
+#   reservado   3x
+#   tamanho do pad  Q
+#   2 x (sequência Q, marca Q, CRC32 de sequência e marca I, reservado 4x)
+
+ASSINATURA = b'VLED'
+VERSAO = 1
+CABECALHO = struct.Struct('<4sB3xQ')
+ESPACO = struct.Struct('<QQI4x')
+TAMANHO_LIVRO = CABECALHO.size + 2 * ESPACO.size
+
+# Bytes reservados no livro por vez por processo
+TAMANHO_LOTE_PADRAO = 1 << 20
+
+def travar(arquivo):
+    """Trava exclusiva (entre processos) do arquivo do livro, esperando se preciso."""
+    if fcntl is not None:
+        fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX)
+    else:
+        arquivo.seek(0)
+        msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK, 1)
+
+def destravar(arquivo):
+    if fcntl is not None:
+        fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+    else:
+        arquivo.seek(0)
+        msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+def crc_espaco(sequencia, marca):
+    return zlib.crc32(struct.pack('<QQ', sequencia, marca))
+
+def ler_marca(mapa):
+    """
+    Marca atual (a do espaço válido de maior sequência).
+
+    :return: Tupla (marca, sequência, espaço a ser gravado na próxima vez).
+    :raises ValueError: Se nenhum dos dois espaços for válido.
+    """
+    validos = []
+    for espaco in range(2):
+        sequencia, marca, crc = ESPACO.unpack_from(mapa, CABECALHO.size + espaco * ESPACO.size)
+        if crc_espaco(sequencia, marca) == crc:
+            validos.append((sequencia, marca, espaco))
+    if not validos:
+        raise ValueError("Livro do pad corrompido: nenhuma marca válida.")
+    sequencia, marca, espaco = max(validos)
+    return marca, sequencia, 1 - espaco
+
+def gravar_marca(mapa, marca, sequencia, espaco):
+    """Grava a marca no espaço indicado e força a gravação no disco (msync)."""
+    ESPACO.pack_into(mapa, CABECALHO.size + espaco * ESPACO.size, sequencia, marca, crc_espaco(sequencia, marca))
+    mapa.flush()
+
+class LivroPad:
+    """
+    Distribui trechos nunca usados de um arquivo de pad entre threads e processos.
+
+    Uso (em cada processo):
+        with LivroPad('pad.bin') as livro:
+            deslocamento = livro.reservar(len(dados))  # para vernam_arquivo_xor
+            chave = gerar_chave_otp(len(dados), livro)  # ou direto os bytes do pad
+    """
+
+    def __init__(self, caminho_pad, caminho_livro=None, tamanho_lote=TAMANHO_LOTE_PADRAO):
+        """
+        :param caminho_pad: Arquivo com os bytes do pad.
+        :param caminho_livro: Arquivo do livro (padrão: caminho_pad + '.livro'), criado se não existir.
+        :param tamanho_lote: Bytes reservados no livro por vez.
+        """
+        if tamanho_lote <= 0:
+            raise ValueError("O tamanho do lote deve ser positivo.")
+        self.caminho_pad = caminho_pad
+        self.caminho_livro = caminho_livro or caminho_pad + '.livro'
+        self.tamanho_lote = tamanho_lote
+        self.tamanho_pad = os.path.getsize(caminho_pad)
+
+        self._trava = threading.Lock()
+        self._pid = None
+        self._abrir()
+
+    def _abrir(self):
+        """Abre (e inicializa, se for novo) o livro e o pad neste processo."""
+        self._pid = os.getpid()
+        self._posicao = self._fim_lote = 0  # Lote local vazio
+        self._arquivo = open(os.open(self.caminho_livro, os.O_RDWR | os.O_CREAT, 0o600), 'r+b')
+
+        travar(self._arquivo)
+        try:
+            if self._arquivo.seek(0, 2) == 0:
+                self._arquivo.write(CABECALHO.pack(ASSINATURA, VERSAO, self.tamanho_pad)
+                                    + 2 * ESPACO.pack(0, 0, crc_espaco(0, 0)))
+                self._arquivo.flush()
+                os.fsync(self._arquivo.fileno())
+        finally:
+            destravar(self._arquivo)
+
+        self._mapa = mmap.mmap(self._arquivo.fileno(), TAMANHO_LIVRO)
+        assinatura, versao, tamanho_pad = CABECALHO.unpack_from(self._mapa)
+        if assinatura != ASSINATURA or versao != VERSAO:
+            raise ValueError("Arquivo do livro inválido ou de versão não suportada.")
+        if tamanho_pad != self.tamanho_pad:
+            raise ValueError("O livro foi criado para um pad de outro tamanho.")
+
+        self._pad = open(self.caminho_pad, 'rb')
+        self._mapa_pad = mmap.mmap(self._pad.fileno(), 0, access=mmap.ACCESS_READ) if self.tamanho_pad else b''
+
+    def _verificar_processo(self):
+        # Depois de um fork o filho herda o lote e a trava do pai: descarta o lote
+        # (senão pai e filho entregariam os mesmos bytes) e reabre os arquivos
+        if self._pid != os.getpid():
+            self._abrir()
+
+    def _reservar_no_livro(self, minimo, desejado):
+        """
+        Avança a marca do livro (sob a trava entre processos) em 'desejado' bytes,
+        ou no que restar do pad, desde que seja pelo menos 'minimo'.
+
+        :return: Tupla (deslocamento, bytes reservados).
+        """
+        travar(self._arquivo)
+        try:
+            marca, sequencia, espaco = ler_marca(self._mapa)
+            tamanho = min(desejado, self.tamanho_pad - marca)
+            if tamanho < minimo:
+                raise ValueError("O pad não tem mais bytes livres (One-Time Pad).")
+            gravar_marca(self._mapa, marca + tamanho, sequencia + 1, espaco)
+        finally:
+            destravar(self._arquivo)
+        return marca, tamanho
+
+    def reservar(self, tamanho):
+        """
+        Reserva 'tamanho' bytes do pad que nenhum outro processo recebeu nem vai receber.
+
+        Pedidos que não cabem no resto do lote local descartam esse resto e pegam um
+        lote novo; pedidos maiores que um lote são reservados direto no livro.
+
+        :return: Deslocamento do trecho reservado no arquivo de pad.
+        :raises ValueError: Se o pad não tiver bytes livres suficientes.
+        """
+        if tamanho < 0:
+            raise ValueError("O tamanho da chave não pode ser negativo.")
+        with self._trava:
+            self._verificar_processo()
+            if tamanho > self.tamanho_lote:
+                return self._reservar_no_livro(tamanho, tamanho)[0]
+
+            if self._fim_lote - self._posicao < tamanho:
+                # Perto do fim do pad o lote pode ser menor, mas cobre pelo menos o pedido
+                self._posicao, lote = self._reservar_no_livro(tamanho, self.tamanho_lote)
+                self._fim_lote = self._posicao + lote
+
+            deslocamento = self._posicao
+            self._posicao += tamanho
+            return deslocamento
+
+    def obter(self, tamanho):
+        """
+        Reserva 'tamanho' bytes e os devolve como memoryview do pad (sem cópia).
+        Mesma interface do ReservatorioPad, então serve para gerar_chave_otp(tamanho, livro).
+        """
+        deslocamento = self.reservar(tamanho)
+        return memoryview(self._mapa_pad)[deslocamento:deslocamento + tamanho]
+
+    def disponivel(self):
+        """Bytes do pad ainda não reservados por nenhum processo."""
+        return self.tamanho_pad - ler_marca(self._mapa)[0]
+
+    def fechar(self):
+        """
+        Fecha o livro. Se ninguém reservou depois do lote local, a sobra dele volta
+        para o livro; caso contrário ela é descartada (nunca reusada).
+        """
+        with self._trava:
+            if self._pid == os.getpid() and self._fim_lote > self._posicao:
+                travar(self._arquivo)
+                try:
+                    marca, sequencia, espaco = ler_marca(self._mapa)
+                    if marca == self._fim_lote:
+                        gravar_marca(self._mapa, self._posicao, sequencia + 1, espaco)
+                finally:
+                    destravar(self._arquivo)
+            self._posicao = self._fim_lote = 0
+            self._mapa.close()
+            self._arquivo.close()
+            if isinstance(self._mapa_pad, mmap.mmap):
+                try:
+                    self._mapa_pad.close()
+                except BufferError:
+                    # Ainda há chaves (memoryviews) em uso: o coletor de lixo desfaz o mapeamento depois
+                    pass
+            self._pad.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
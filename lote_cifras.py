@@ -0,0 +1,206 @@
+import argparse
+import json
+import sys
+
+import cifra_cesar_robusta
+import cifra_vernam_modular_ascii
+import cifravernam_otp
+import vernam_cifrar_decifrar
+from carregar_cifras import carregar_vernam_xor
+
+cifra_vernam_xor = carregar_vernam_xor()
+
+# --- Modo Lote (stdin -> stdout, sem menu) ---
+
+# Quantidade de resultados acumulados antes de cada escrita na saída
+TAMANHO_LOTE_SAIDA = 4096
+
+# Tamanho dos buffers de leitura e escrita
+TAMANHO_BUFFER = 1 << 20
+
+MODOS = ('cifrar', 'decifrar')
+
+def cesar(texto, chave, modo):
+    modo = 'criptografia' if modo == 'cifrar' else 'descriptografia'
+    return cifra_cesar_robusta.processa(texto, int(chave), modo=modo), None
+
+def vernam_modular(texto, chave, modo):
+    if chave is None:
+        chave = cifravernam_otp.gerar_chave(sum(1 for c in texto if c in cifravernam_otp.indice_alfabeto))
+        return cifravernam_otp.processamento(texto, chave, mode='cripto'), chave
+    mode = 'cripto' if modo == 'cifrar' else 'decifrar'
+    return cifravernam_otp.processamento(texto, chave, mode=mode), None
+
+def vernam(texto, chave, modo):
+    if chave is None:
+        chave = vernam_cifrar_decifrar.gerar_chave_otp(sum(map(str.isalpha, texto)))
+        return vernam_cifrar_decifrar.vernam_cipher(texto, chave, modo='cifrar'), chave
+    return vernam_cifrar_decifrar.vernam_cipher(texto, chave, modo=modo), None
+
+def vernam_ascii(texto, chave, modo):
+    if chave is None:
+        chave = cifra_vernam_modular_ascii.gerar_chave_otp_alfabetica(sum(map(str.isalpha, texto)))
+        return cifra_vernam_modular_ascii.vernam_modular_completo(texto, chave, modo='criptografia'), chave
+    modo = 'criptografia' if modo == 'cifrar' else 'descriptografia'
+    return cifra_vernam_modular_ascii.vernam_modular_completo(texto, chave, modo=modo), None
+
+def xor(texto, chave, modo):
+    # Para o XOR, texto, chave e resultado circulam em hexadecimal (como no script original)
+    dados = bytes.fromhex(texto)
+    if chave is None:
+        chave_bytes = cifra_vernam_xor.gerar_chave_otp(len(dados))
+        return cifra_vernam_xor.vernam_cipher_xor(dados, chave_bytes).hex(), bytes(chave_bytes).hex()
+    return cifra_vernam_xor.vernam_cipher_xor(dados, bytes.fromhex(chave)).hex(), None
+
+# Cada cifra recebe (texto, chave, modo) e devolve (resultado, chave gerada ou None).
+# Sem chave, as cifras OTP geram uma nova chave (apenas para cifrar).
+CIFRAS = {
+    'cesar': cesar,
+    'vernam_modular': vernam_modular,
+    'vernam': vernam,
+    'vernam_ascii': vernam_ascii,
+    'xor': xor,
+}
+
+def chave_fixa_permitida(cifra, modo):
+    """
+    Uma mesma chave (a de --chave) só pode valer para vários registros na cifra de
+    César ou para decifrar: cifrar vários registros com o mesmo pad quebra o OTP.
+    """
+    return cifra == 'cesar' or modo == 'decifrar'
+
+def processar_registro(cifra, texto, chave, modo):
+    """
+    Processa um registro e devolve (resultado, chave gerada ou None).
+
+    :raises ValueError: Cifra ou modo inválidos, chave ausente quando obrigatória,
+                        ou erro da própria cifra (ex.: tamanhos diferentes).
+    :raises TypeError: Texto ou chave de tipo inválido (ex.: número em vez de string).
+    """
+    if cifra not in CIFRAS:
+        raise ValueError(f"Cifra desconhecida: {cifra!r}. Use uma de: {', '.join(CIFRAS)}.")
+    if modo not in MODOS:
+        raise ValueError("Modo inválido. Use 'cifrar' ou 'decifrar'.")
+    if not isinstance(texto, str):
+        raise TypeError("O texto deve ser uma string.")
+    if chave is None and (modo == 'decifrar' or cifra == 'cesar'):
+        raise ValueError("A chave é obrigatória para decifrar (e para a cifra de César).")
+    if cifra == 'cesar':
+        # Aceita o deslocamento como inteiro JSON ou como string numérica
+        if isinstance(chave, bool) or not isinstance(chave, (int, str)):
+            raise TypeError("A chave da cifra de César deve ser um inteiro.")
+    elif chave is not None and not isinstance(chave, str):
+        raise TypeError("A chave deve ser uma string.")
+    return CIFRAS[cifra](texto, chave, modo)
+
+def processar_dicionario(registro, padrao):
+    """
+    Processa um registro já decodificado do JSON e devolve o dicionário de saída:
+    {"id", "resultado", "chave"} ou {"id", "erro"}. Campos ausentes no registro
+    usam os valores de 'padrao'. Qualquer erro do registro vira um {"id", "erro"},
+    sem interromper os demais.
+    """
+    saida = {}
+    try:
+        if not isinstance(registro, dict):
+            raise TypeError("Cada registro deve ser um objeto JSON.")
+        if 'id' in registro:
+            saida['id'] = registro['id']
+        cifra = registro.get('cifra', padrao['cifra'])
+        modo = registro.get('modo', padrao['modo'])
+        if 'chave' in registro:
+            chave = registro['chave']
+        elif padrao['chave'] is not None and not chave_fixa_permitida(cifra, modo):
+            raise ValueError("A chave padrão (--chave) não pode cifrar registros de uma cifra OTP: "
+                             "o mesmo pad seria reusado. Informe a chave no registro ou deixe gerar.")
+        else:
+            chave = padrao['chave']
+        resultado, chave_gerada = processar_registro(cifra, registro['texto'], chave, modo)
+        saida['resultado'] = resultado
+        if chave_gerada is not None:
+            saida['chave'] = chave_gerada
+    except Exception as e:
+        saida['erro'] = f"{type(e).__name__}: {e}"
+    return saida
+
+def processar_jsonl(entrada, padrao):
+    """
+    Gera uma linha JSON de saída para cada linha JSON de entrada.
+
+    Campos aceitos: "texto" (obrigatório), "chave", "modo", "cifra" e "id"
+    (repetido na saída). Campos ausentes usam os valores de 'padrao'.
+    """
+    for linha in entrada:
+        if not linha.strip():
+            continue
+        try:
+            registro = json.loads(linha)
+        except ValueError as e:
+            saida = {'erro': f"{type(e).__name__}: {e}"}
+        else:
+            saida = processar_dicionario(registro, padrao)
+        yield json.dumps(saida, ensure_ascii=False) + "\n"
+
+def processar_linhas(entrada, padrao, erros):
+    """
+    Gera uma linha de saída para cada linha de texto da entrada, com cifra, chave
+    e modo fixos. Em caso de erro, escreve uma linha vazia (mantendo o alinhamento)
+    e a mensagem em 'erros'.
+    """
+    for numero, linha in enumerate(entrada, 1):
+        try:
+            resultado, chave_gerada = processar_registro(padrao['cifra'], linha.rstrip("\r\n"), padrao['chave'], padrao['modo'])
+        except Exception as e:
+            erros.write(f"ERRO na linha {numero}: {type(e).__name__}: {e}\n")
+            yield "\n"
+            continue
+        yield resultado + ("\t" + chave_gerada if chave_gerada is not None else "") + "\n"
+
+def escrever_em_lotes(linhas, saida):
+    """
+    Escreve as linhas agrupadas em blocos de TAMANHO_LOTE_SAIDA, reduzindo chamadas
+    de escrita. Se a geração for interrompida, o que já foi calculado é escrito.
+    """
+    lote = []
+    try:
+        for linha in linhas:
+            lote.append(linha)
+            if len(lote) >= TAMANHO_LOTE_SAIDA:
+                saida.write("".join(lote))
+                lote.clear()
+    finally:
+        if lote:
+            saida.write("".join(lote))
+        saida.flush()
+
+def main(argumentos=None, entrada=None, saida=None):
+    parser = argparse.ArgumentParser(
+        description="Cifra ou decifra registros em lote, lidos da entrada padrão.",
+        epilog="No formato 'linhas', a chave gerada (se houver) sai após um TAB.",
+    )
+    parser.add_argument('--formato', choices=('jsonl', 'linhas'), default='jsonl')
+    parser.add_argument('--cifra', choices=tuple(CIFRAS), default='vernam_modular', help="Cifra padrão.")
+    parser.add_argument('--modo', choices=MODOS, default='cifrar', help="Modo padrão.")
+    parser.add_argument('--chave', help="Chave padrão (sem chave, as cifras OTP geram uma por registro). "
+                                        "Para cifrar, só é aceita na cifra de César.")
+    opcoes = parser.parse_args(argumentos)
+    if opcoes.chave is not None and not chave_fixa_permitida(opcoes.cifra, opcoes.modo):
+        parser.error("--chave não pode ser usada para cifrar com uma cifra OTP: "
+                     "o mesmo pad seria reusado em todos os registros.")
+    padrao = {'cifra': opcoes.cifra, 'modo': opcoes.modo, 'chave': opcoes.chave}
+
+    # Leitura e escrita com buffers grandes, em UTF-8, independentemente do terminal
+    entrada = entrada or open(sys.stdin.fileno(), 'r', buffering=TAMANHO_BUFFER,
+                              encoding='utf-8', newline="\n", closefd=False)
+    saida = saida or open(sys.stdout.fileno(), 'w', buffering=TAMANHO_BUFFER,
+                          encoding='utf-8', newline="\n", closefd=False)
+
+    if opcoes.formato == 'jsonl':
+        linhas = processar_jsonl(entrada, padrao)
+    else:
+        linhas = processar_linhas(entrada, padrao, sys.stderr)
+    escrever_em_lotes(linhas, saida)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
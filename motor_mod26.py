@@ -0,0 +1,61 @@
+try:
+    import numpy as np # Opcional: sem NumPy as cifras usam o laço caractere a caractere
+except ImportError:
+    np = None
+
+# --- Motor NumPy das Cifras mod 26 com Preservação de Caso ---
+#
+# Usado por 'vernam_cipher' (vernam_cifrar_decifrar.py) e 'vernam_modular_completo'
+# (cifra_vernam_modular_ascii.py). Texto e chave viram vetores de bytes uma única
+# vez; uma máscara marca as letras (de qualquer caso) e a soma/subtração mod 26 de
+# todas elas é feita com operações vetorizadas, sem laço em Python.
+#
+# Só vale para texto e chave ASCII: aí 'isalpha' e 'isupper' equivalem a A-Z/a-z, e
+# a chave convertida para o caso da letra do texto tem o mesmo índice (0-25) em
+# qualquer caso. Com letras não ASCII (ex.: 'é') as funções originais têm regras
+# próprias e continuam sendo usadas.
+
+# Abaixo desse tamanho o laço em Python é mais rápido que montar os vetores
+TAMANHO_MINIMO_NUMPY = 256
+
+def pode_usar(texto, chave):
+    """Indica se o motor vetorizado dá o mesmo resultado da função original para essa entrada."""
+    return (np is not None and len(texto) >= TAMANHO_MINIMO_NUMPY
+            and texto.isascii() and chave.isascii())
+
+def vernam_mod26(texto, chave, sinal, mensagem_erro):
+    """
+    Cifra (sinal = +1) ou decifra (sinal = -1) as letras ASCII do texto com as letras
+    da chave, preservando o caso do texto e mantendo os demais caracteres.
+
+    :raises ValueError: Com 'mensagem_erro', se texto e chave tiverem números de letras diferentes.
+    """
+    codigos = np.frombuffer(texto.encode('ascii'), dtype=np.uint8)
+    codigos_chave = np.frombuffer(chave.encode('ascii'), dtype=np.uint8)
+
+    # (código | 0x20) - 'a' em uint8: 0-25 para letras de qualquer caso, >= 26 para o resto
+    valores = (codigos | 0x20) - np.uint8(97)
+    letras = valores < 26
+    valores_chave = (codigos_chave | 0x20) - np.uint8(97)
+    letras_chave = valores_chave < 26
+    if not letras_chave.all():
+        valores_chave = valores_chave[letras_chave]
+
+    if np.count_nonzero(letras) != len(valores_chave):
+        raise ValueError(mensagem_erro)
+
+    # Espalha a chave nas posições das letras do texto (zero no resto, que fica igual)
+    deslocamentos = np.zeros(len(codigos), dtype=np.uint8)
+    deslocamentos[letras] = valores_chave
+
+    # O caso é preservado somando o deslocamento ao próprio código; quando a soma
+    # passa de 'z'/'Z' (ou a subtração fica antes de 'a'/'A'), volta 26 posições.
+    if sinal > 0:
+        volta = ((valores + deslocamentos) >= 26) & letras
+        resultado = codigos + deslocamentos
+        resultado -= volta * np.uint8(26)
+    else:
+        volta = ((valores - deslocamentos) >= 26) & letras
+        resultado = codigos - deslocamentos
+        resultado += volta * np.uint8(26)
+    return resultado.tobytes().decode('ascii')
@@ -0,0 +1,181 @@
+import math
+import multiprocessing
+import os
+import string
+
+try:
+    import numpy as np # Opcional: pontua lotes inteiros com operações vetorizadas
+except ImportError:
+    np = None
+
+from cifra_cesar_robusta import N, alfabeto
+
+# --- Quebra da Cifra de César por Frequência (auditoria) ---
+
+# Frequência aproximada das letras em português (%), sem separar os acentos
+FREQUENCIAS_PORTUGUES = {
+    'a': 14.63, 'b': 1.04, 'c': 3.88, 'd': 4.99, 'e': 12.57, 'f': 1.02, 'g': 1.30,
+    'h': 1.28, 'i': 6.18, 'j': 0.40, 'k': 0.02, 'l': 2.78, 'm': 4.74, 'n': 5.05,
+    'o': 10.73, 'p': 2.52, 'q': 1.20, 'r': 6.53, 's': 7.81, 't': 4.34, 'u': 4.63,
+    'v': 1.67, 'w': 0.01, 'x': 0.21, 'y': 0.01, 'z': 0.47,
+}
+# Parte de cada letra base que aparece acentuada
+FREQUENCIAS_ACENTOS = {
+    'ã': 0.73, 'ç': 0.53, 'é': 0.43, 'á': 0.50, 'í': 0.30, 'ó': 0.22, 'õ': 0.12,
+    'ê': 0.31, 'â': 0.13, 'ú': 0.12, 'à': 0.05, 'ô': 0.06,
+}
+PROPORCAO_MAIUSCULAS = 0.03 # Fração das letras escritas em maiúscula
+PROPORCAO_DIGITOS = 0.005 # Fração dos caracteres do alfabeto que são dígitos
+PROPORCAO_SIMBOLOS = 0.005 # Fração de "!?-()"
+FREQUENCIA_MINIMA = 1e-5 # Evita divisão por zero para caracteres raros
+
+# Quantidade de textos processados por vez (e por tarefa no modo paralelo)
+TAMANHO_BLOCO_TEXTOS = 4096
+
+def modelo_portugues():
+    """
+    Distribuição esperada (soma 1) de cada caractere do 'alfabeto' em texto
+    português, na ordem dos índices do alfabeto.
+    """
+    pesos = dict.fromkeys(alfabeto, 0.0)
+    letras = dict(FREQUENCIAS_PORTUGUES, **FREQUENCIAS_ACENTOS)
+    total_letras = sum(letras.values())
+    for letra, frequencia in letras.items():
+        pesos[letra] += frequencia / total_letras * (1 - PROPORCAO_MAIUSCULAS)
+        pesos[letra.upper()] += frequencia / total_letras * PROPORCAO_MAIUSCULAS
+    for digito in string.digits:
+        pesos[digito] += PROPORCAO_DIGITOS / len(string.digits)
+    for simbolo in "!?-()":
+        pesos[simbolo] += PROPORCAO_SIMBOLOS / 5
+
+    esperado = [max(pesos[caracter], FREQUENCIA_MINIMA) for caracter in alfabeto]
+    total = sum(esperado)
+    return [valor / total for valor in esperado]
+
+MODELO = modelo_portugues()
+
+# Tabela código Unicode -> índice no alfabeto (-1 fora dele); o alfabeto cabe em Latin-1
+INDICES_CODIGO = [-1] * 256
+for _indice, _caracter in enumerate(alfabeto):
+    INDICES_CODIGO[ord(_caracter)] = _indice
+
+if np is not None:
+    # ESPERADO_INVERSO[K, j] = 1 / E[(j - K) mod N]: inverso da frequência esperada do
+    # caractere cifrado j quando a chave é K (pois C = P + K).
+    _modelo = np.array(MODELO)
+    ESPERADO_INVERSO = np.stack([1 / np.roll(_modelo, K) for K in range(N)])
+    TABELA_INDICES = np.array(INDICES_CODIGO, dtype=np.int64)
+
+def histogramas(textos):
+    """
+    Conta quantas vezes cada caractere do alfabeto aparece em cada texto.
+
+    :return: Matriz (len(textos) x N) de contagens (lista de listas sem NumPy).
+    """
+    if np is None:
+        resultado = []
+        for texto in textos:
+            contagem = [0] * N
+            for caracter in texto:
+                codigo = ord(caracter)
+                if codigo < 256 and INDICES_CODIGO[codigo] >= 0:
+                    contagem[INDICES_CODIGO[codigo]] += 1
+            resultado.append(contagem)
+        return resultado
+
+    # Todos os textos viram um único vetor de códigos (UTF-32), sem laço em Python
+    tamanhos = np.fromiter((len(texto) for texto in textos), dtype=np.int64, count=len(textos))
+    codigos = np.frombuffer("".join(textos).encode('utf-32-le'), dtype=np.uint32)
+    linhas = np.repeat(np.arange(len(textos)), tamanhos)
+
+    dentro = codigos < 256
+    indices = np.full(codigos.shape, -1, dtype=np.int64)
+    indices[dentro] = TABELA_INDICES[codigos[dentro]]
+    validos = indices >= 0
+    posicoes = linhas[validos] * N + indices[validos]
+    return np.bincount(posicoes, minlength=len(textos) * N).reshape(len(textos), N)
+
+def qui_quadrado(contagens):
+    """
+    Qui-quadrado de cada texto contra o modelo português, para todas as N chaves.
+
+    Usa a identidade sum((h - nE)^2 / nE) = sum(h^2 / E) / n - n, então todas
+    as rotações de todos os textos saem de um único produto de matrizes.
+
+    :return: Matriz (textos x N): qui-quadrado da chave K na coluna K.
+    """
+    if np is None:
+        resultado = []
+        for contagem in contagens:
+            total = sum(contagem) or 1
+            resultado.append([
+                sum(h * h / MODELO[(j - K) % N] for j, h in enumerate(contagem) if h) / total - total
+                for K in range(N)
+            ])
+        return resultado
+
+    contagens = np.asarray(contagens, dtype=np.float64)
+    totais = np.maximum(contagens.sum(axis=1, keepdims=True), 1)
+    return (contagens ** 2) @ ESPERADO_INVERSO.T / totais - totais
+
+def ordenar_chaves(pontuacoes, melhores):
+    """
+    Converte as pontuações de cada texto em [(chave, confiança), ...] da melhor para a pior.
+    A confiança é a verossimilhança relativa exp(-qui²/2), normalizada entre as N chaves.
+    """
+    if np is None:
+        resultado = []
+        for linha in pontuacoes:
+            menor = min(linha)
+            pesos = [math.exp(-(valor - menor) / 2) for valor in linha]
+            total = sum(pesos)
+            ranking = sorted(range(N), key=linha.__getitem__)[:melhores]
+            resultado.append([(K, pesos[K] / total) for K in ranking])
+        return resultado
+
+    pesos = np.exp(-(pontuacoes - pontuacoes.min(axis=1, keepdims=True)) / 2)
+    confiancas = pesos / pesos.sum(axis=1, keepdims=True)
+    ranking = np.argsort(pontuacoes, axis=1, kind='stable')[:, :melhores]
+    melhores_confiancas = np.take_along_axis(confiancas, ranking, axis=1)
+    return [list(zip(chaves, valores)) for chaves, valores in zip(ranking.tolist(), melhores_confiancas.tolist())]
+
+def quebrar_lote(textos, melhores=3):
+    """
+    Estima a chave de cada texto cifrado com 'processa' (modo criptografia).
+
+    :return: Para cada texto, lista [(chave, confiança), ...]. Para decifrar, use
+             processa(texto, chave, modo='descriptografia').
+    """
+    textos = list(textos)
+    resultado = []
+    for inicio in range(0, len(textos), TAMANHO_BLOCO_TEXTOS):
+        bloco = textos[inicio:inicio + TAMANHO_BLOCO_TEXTOS]
+        resultado.extend(ordenar_chaves(qui_quadrado(histogramas(bloco)), melhores))
+    return resultado
+
+def quebrar(texto, melhores=3):
+    """Estima a chave de um único texto cifrado. Ver 'quebrar_lote'."""
+    return quebrar_lote([texto], melhores)[0]
+
+def _quebrar_bloco(argumentos):
+    return quebrar_lote(*argumentos)
+
+def quebrar_lote_paralelo(textos, melhores=3, processos=None):
+    """
+    Versão de 'quebrar_lote' que divide os textos em blocos entre vários processos.
+    Aceita qualquer iterável (os textos são lidos bloco a bloco) e devolve um
+    gerador com os resultados na mesma ordem dos textos.
+    """
+    def blocos():
+        bloco = []
+        for texto in textos:
+            bloco.append(texto)
+            if len(bloco) == TAMANHO_BLOCO_TEXTOS:
+                yield bloco, melhores
+                bloco = []
+        if bloco:
+            yield bloco, melhores
+
+    with multiprocessing.Pool(processos or os.cpu_count()) as pool:
+        for resultados in pool.imap(_quebrar_bloco, blocos()):
+            yield from resultados
@@ -0,0 +1,250 @@
+import argparse
+import asyncio
+import collections
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from lote_cifras import CIFRAS, MODOS, processar_dicionario
+
+# --- Serviço de Cifras (asyncio, TCP ou socket Unix) ---
+#
+# Protocolo: uma linha JSON por pedido, no mesmo formato do lote_cifras
+# ("texto", "chave", "modo", "cifra", "id"), e uma linha JSON por resposta,
+# na mesma ordem dos pedidos da conexão. O pedido {"comando": "estatisticas"}
+# devolve as latências (percentis) e o estado das filas.
+
+# Valores usados quando o pedido não informa cifra, modo ou chave
+PADRAO = {'cifra': 'vernam_modular', 'modo': 'cifrar', 'chave': None}
+
+# Pedidos com linhas a partir deste tamanho (bytes) vão direto para o pool de processos
+LIMITE_GRANDE = 64 * 1024
+
+# Tamanho máximo de uma linha de pedido
+TAMANHO_MAXIMO_LINHA = 256 << 20
+
+# Quantidade de latências recentes guardadas para calcular os percentis
+AMOSTRAS_LATENCIA = 10000
+
+def responder_registro(registro):
+    """
+    Processa e codifica um pedido já decodificado. Nunca levanta exceção: um erro
+    vira a resposta {"erro"} só deste pedido, sem afetar os outros do mesmo lote.
+    """
+    try:
+        return json.dumps(processar_dicionario(registro, PADRAO), ensure_ascii=False)
+    except Exception as e:
+        return json.dumps({'erro': f"{type(e).__name__}: {e}"}, ensure_ascii=False)
+
+def responder_linha(linha):
+    """Decodifica, processa e codifica um pedido inteiro (usada no pool de processos)."""
+    try:
+        registro = json.loads(linha)
+    except ValueError as e:
+        return json.dumps({'erro': f"{type(e).__name__}: {e}"}, ensure_ascii=False)
+    return responder_registro(registro)
+
+def responder_lote(registros):
+    """Processa um lote de pedidos pequenos já decodificados (usada na thread de lotes)."""
+    return [responder_registro(registro) for registro in registros]
+
+def percentil(valores_ordenados, fracao):
+    """Percentil pelo método do posto mais próximo, sobre uma lista já ordenada."""
+    if not valores_ordenados:
+        return None
+    posicao = max(0, min(len(valores_ordenados) - 1, int(round(fracao * len(valores_ordenados))) - 1))
+    return valores_ordenados[posicao]
+
+class ServicoCifras:
+    """
+    Serviço de cifras de longa duração.
+
+    Pedidos pequenos entram numa fila limitada (contrapressão: quando ela enche,
+    a leitura das conexões para) e são agrupados em lotes processados numa
+    thread. Pedidos grandes vão para um pool de processos. O laço de eventos
+    nunca executa uma cifra diretamente.
+
+    Os pedidos grandes em andamento, somando todas as conexões, são limitados
+    por 'grandes_simultaneos': com as vagas esgotadas, a conexão que leu um pedido
+    grande para de ler até uma vaga abrir. Assim a memória dos pedidos grandes
+    fica em no máximo uma linha por vaga mais uma linha à espera por conexão.
+    """
+
+    def __init__(self, processos=None, tamanho_fila=1024, tamanho_lote=64, espera_lote=0.002,
+                 limite_grande=LIMITE_GRANDE, pendentes_conexao=256, grandes_simultaneos=None):
+        """
+        :param processos: Processos do pool de pedidos grandes (padrão: os.cpu_count()).
+        :param tamanho_fila: Máximo de pedidos pequenos aguardando um lote.
+        :param tamanho_lote: Máximo de pedidos por lote.
+        :param espera_lote: Tempo máximo (s) esperando mais pedidos para completar um lote.
+        :param limite_grande: Tamanho (bytes) a partir do qual o pedido vai para o pool de processos.
+        :param pendentes_conexao: Máximo de respostas pendentes por conexão.
+        :param grandes_simultaneos: Máximo de pedidos grandes em andamento no serviço
+                                    inteiro (padrão: o dobro dos processos).
+        """
+        self.tamanho_lote = tamanho_lote
+        self.espera_lote = espera_lote
+        self.limite_grande = limite_grande
+        self.pendentes_conexao = pendentes_conexao
+
+        self.fila = asyncio.Queue(tamanho_fila)
+        self.executor_lotes = ThreadPoolExecutor(1, thread_name_prefix="lotes")
+        processos = processos or os.cpu_count()
+        self.executor_grandes = ProcessPoolExecutor(processos)
+        self.vagas_grandes = asyncio.Semaphore(grandes_simultaneos or 2 * processos)
+        self.latencias = collections.deque(maxlen=AMOSTRAS_LATENCIA)
+        self.contadores = collections.Counter()
+
+    async def agrupar(self):
+        """Tarefa que junta pedidos da fila em lotes e os processa fora do laço de eventos."""
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self.fila.get()]
+            prazo = loop.time() + self.espera_lote
+            while len(lote) < self.tamanho_lote:
+                try:
+                    lote.append(self.fila.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                restante = prazo - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self.fila.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+
+            self.contadores['lotes'] += 1
+            try:
+                respostas = await loop.run_in_executor(self.executor_lotes, responder_lote, [r for r, _ in lote])
+            except Exception as e:
+                respostas = [json.dumps({'erro': f"{type(e).__name__}: {e}"})] * len(lote)
+            for (_, futuro), resposta in zip(lote, respostas):
+                if not futuro.done():
+                    futuro.set_result(resposta)
+
+    async def tratar(self, linha):
+        """Trata uma linha de pedido e devolve a linha JSON de resposta."""
+        inicio = time.perf_counter()
+        loop = asyncio.get_running_loop()
+
+        if len(linha) >= self.limite_grande:
+            self.contadores['grandes'] += 1
+            resposta = await loop.run_in_executor(self.executor_grandes, responder_linha, linha)
+        else:
+            try:
+                registro = json.loads(linha)
+            except ValueError as e:
+                return json.dumps({'erro': f"{type(e).__name__}: {e}"}, ensure_ascii=False)
+            if isinstance(registro, dict) and registro.get('comando') == 'estatisticas':
+                return json.dumps(self.estatisticas())
+
+            self.contadores['pequenos'] += 1
+            futuro = loop.create_future()
+            await self.fila.put((registro, futuro))
+            resposta = await futuro
+
+        self.latencias.append(time.perf_counter() - inicio)
+        return resposta
+
+    async def atender(self, leitor, escritor):
+        """Atende uma conexão: lê pedidos continuamente e responde na ordem de chegada."""
+        pendentes = asyncio.Queue(self.pendentes_conexao)
+
+        async def responder():
+            while (tarefa := await pendentes.get()) is not None:
+                try:
+                    resposta = await tarefa
+                except Exception as e:
+                    resposta = json.dumps({'erro': f"{type(e).__name__}: {e}"}, ensure_ascii=False)
+                escritor.write(resposta.encode('utf-8') + b"\n")
+                await escritor.drain()
+
+        tarefa_respostas = asyncio.create_task(responder())
+        try:
+            while linha := await leitor.readline():
+                if linha.strip():
+                    if len(linha) >= self.limite_grande:
+                        # Limite global: sem vaga para pedidos grandes, a leitura espera
+                        await self.vagas_grandes.acquire()
+                        tarefa = asyncio.create_task(self.tratar(linha))
+                        tarefa.add_done_callback(lambda _: self.vagas_grandes.release())
+                    else:
+                        tarefa = asyncio.create_task(self.tratar(linha))
+                    # Fila limitada: com respostas demais pendentes, a leitura espera
+                    await pendentes.put(tarefa)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            await pendentes.put(None)
+            try:
+                await tarefa_respostas
+            except ConnectionError:
+                pass
+            escritor.close()
+
+    def estatisticas(self):
+        """Percentis de latência (ms) dos pedidos recentes e contadores do serviço."""
+        ordenadas = sorted(self.latencias)
+        em_ms = lambda valor: None if valor is None else valor * 1000
+        return {
+            'latencia_ms': {
+                'p50': em_ms(percentil(ordenadas, 0.50)),
+                'p90': em_ms(percentil(ordenadas, 0.90)),
+                'p99': em_ms(percentil(ordenadas, 0.99)),
+                'max': em_ms(ordenadas[-1] if ordenadas else None),
+                'amostras': len(ordenadas),
+            },
+            'fila': self.fila.qsize(),
+            'pedidos_pequenos': self.contadores['pequenos'],
+            'pedidos_grandes': self.contadores['grandes'],
+            'lotes': self.contadores['lotes'],
+        }
+
+    def fechar(self):
+        self.executor_lotes.shutdown(wait=False, cancel_futures=True)
+        self.executor_grandes.shutdown(wait=False, cancel_futures=True)
+
+async def servir(opcoes):
+    servico = ServicoCifras(processos=opcoes.processos, tamanho_fila=opcoes.tamanho_fila,
+                            tamanho_lote=opcoes.tamanho_lote, espera_lote=opcoes.espera_lote / 1000,
+                            limite_grande=opcoes.limite_grande, grandes_simultaneos=opcoes.grandes_simultaneos)
+    tarefa_lotes = asyncio.create_task(servico.agrupar())
+    try:
+        if opcoes.unix:
+            servidor = await asyncio.start_unix_server(servico.atender, opcoes.unix, limit=TAMANHO_MAXIMO_LINHA)
+        else:
+            servidor = await asyncio.start_server(servico.atender, opcoes.host, opcoes.porta, limit=TAMANHO_MAXIMO_LINHA)
+        enderecos = ", ".join(str(s.getsockname()) for s in servidor.sockets)
+        print(f"Serviço de cifras ouvindo em {enderecos} (cifras: {', '.join(CIFRAS)}; modos: {', '.join(MODOS)})",
+              file=sys.stderr)
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        tarefa_lotes.cancel()
+        servico.fechar()
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Serviço local de cifras (uma linha JSON por pedido).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--unix', help="Caminho de um socket Unix (no lugar de TCP).")
+    parser.add_argument('--processos', type=int, help="Processos para pedidos grandes.")
+    parser.add_argument('--tamanho-fila', type=int, default=1024)
+    parser.add_argument('--tamanho-lote', type=int, default=64)
+    parser.add_argument('--espera-lote', type=float, default=2.0, help="Espera máxima por lote, em ms.")
+    parser.add_argument('--limite-grande', type=int, default=LIMITE_GRANDE, help="Bytes a partir dos quais o pedido vai para o pool de processos.")
+    parser.add_argument('--grandes-simultaneos', type=int, help="Máximo de pedidos grandes em andamento (padrão: 2 x processos).")
+    opcoes = parser.parse_args(argumentos)
+
+    try:
+        asyncio.run(servir(opcoes))
+    except KeyboardInterrupt:
+        print("Encerrado.", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
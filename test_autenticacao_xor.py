@@ -0,0 +1,94 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import carregar_cifras
+
+cifra_xor = carregar_cifras.carregar_vernam_xor()
+
+TAMANHOS = (0, 1, 511, 512, 513, (1 << 20) + 100)
+
+def pad_para(tamanho):
+    return os.urandom(tamanho + cifra_xor.TAMANHO_CHAVE_MAC)
+
+class TestAutenticacaoXor(unittest.TestCase):
+
+    def setUp(self):
+        self.sorteio = random.Random(19)
+
+    def test_ida_e_volta(self):
+        for tamanho in TAMANHOS:
+            dados, chave = os.urandom(tamanho), pad_para(tamanho)
+            cifrado, etiqueta = cifra_xor.cifrar_autenticado_xor(dados, chave)
+            self.assertEqual(len(etiqueta), cifra_xor.TAMANHO_ETIQUETA)
+            self.assertEqual(cifrado, cifra_xor.vernam_cipher_xor(dados, chave[:tamanho]))
+            self.assertEqual(cifra_xor.decifrar_autenticado_xor(cifrado, etiqueta, chave), dados)
+
+    @unittest.skipIf(cifra_xor.np is None, "NumPy não instalado")
+    def test_etiqueta_igual_sem_numpy(self):
+        # O NH vetorizado (NumPy) e o laço em Python devem dar a mesma etiqueta
+        for tamanho in TAMANHOS:
+            dados, chave = os.urandom(tamanho), pad_para(tamanho)
+            _, etiqueta_numpy = cifra_xor.cifrar_autenticado_xor(dados, chave)
+            with mock.patch.object(cifra_xor, 'np', None):
+                _, etiqueta_python = cifra_xor.cifrar_autenticado_xor(dados, chave)
+            self.assertEqual(etiqueta_numpy, etiqueta_python, tamanho)
+
+    def test_alteracao_rejeitada(self):
+        for tamanho in TAMANHOS:
+            dados, chave = os.urandom(tamanho), pad_para(tamanho)
+            cifrado, etiqueta = cifra_xor.cifrar_autenticado_xor(dados, chave)
+
+            if tamanho:
+                alterado = bytearray(cifrado)
+                alterado[self.sorteio.randrange(tamanho)] ^= 1 << self.sorteio.randrange(8)
+                saida = bytearray(tamanho)
+                with self.assertRaises(ValueError):
+                    cifra_xor.decifrar_autenticado_xor(alterado, etiqueta, chave, saida=saida)
+                self.assertEqual(saida, bytes(tamanho)) # Nada do texto plano é liberado
+
+            etiqueta_alterada = bytearray(etiqueta)
+            etiqueta_alterada[self.sorteio.randrange(len(etiqueta))] ^= 1 << self.sorteio.randrange(8)
+            with self.assertRaises(ValueError):
+                cifra_xor.decifrar_autenticado_xor(cifrado, etiqueta_alterada, chave)
+
+    def test_modo_arquivo(self):
+        deslocamento = 50
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = lambda nome: os.path.join(pasta, nome)
+            for tamanho in (0, 100, 3 * (1 << 20) + 17):
+                dados = os.urandom(tamanho)
+                pad = os.urandom(deslocamento + tamanho + cifra_xor.TAMANHO_CHAVE_MAC)
+                with open(caminho('plano'), 'wb') as arquivo:
+                    arquivo.write(dados)
+                with open(caminho('pad'), 'wb') as arquivo:
+                    arquivo.write(pad)
+
+                consumidos = cifra_xor.vernam_arquivo_autenticado_xor(
+                    caminho('plano'), caminho('pad'), caminho('cifrado'), 'cifrar', deslocamento, tamanho_bloco=1 << 20)
+                self.assertEqual(consumidos, tamanho + cifra_xor.TAMANHO_CHAVE_MAC)
+                with open(caminho('cifrado'), 'rb') as arquivo:
+                    gravado = arquivo.read()
+                cifrado, etiqueta = cifra_xor.cifrar_autenticado_xor(dados, pad[deslocamento:])
+                self.assertEqual(gravado, bytes(cifrado) + etiqueta)
+
+                cifra_xor.vernam_arquivo_autenticado_xor(
+                    caminho('cifrado'), caminho('pad'), caminho('decifrado'), 'decifrar', deslocamento, tamanho_bloco=1000)
+                with open(caminho('decifrado'), 'rb') as arquivo:
+                    self.assertEqual(arquivo.read(), dados)
+                os.remove(caminho('decifrado'))
+
+                alterado = bytearray(gravado)
+                alterado[self.sorteio.randrange(len(alterado))] ^= 1
+                with open(caminho('cifrado'), 'wb') as arquivo:
+                    arquivo.write(alterado)
+                with self.assertRaises(ValueError):
+                    cifra_xor.vernam_arquivo_autenticado_xor(
+                        caminho('cifrado'), caminho('pad'), caminho('decifrado'), 'decifrar', deslocamento)
+                self.assertFalse(os.path.exists(caminho('decifrado')))
+                self.assertFalse(os.path.exists(caminho('decifrado') + '.parcial'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import unittest
+
+import carregar_cifras
+
+cifra_xor = carregar_cifras.carregar_vernam_xor()
+
+class TestFluxoChave(unittest.TestCase):
+
+    def setUp(self):
+        self.semente = cifra_xor.gerar_semente()
+
+    def test_nonces_distintos_geram_fluxos_distintos(self):
+        # Nonces que só diferem por zeros à direita (ou vazio) não podem coincidir
+        nonces = [b'', b'\0', b'\0' * 16, b'a', b'a\0', b'b', bytes(range(64))]
+        fluxos = {cifra_xor.gerar_fluxo_chave(self.semente, 0, 64, nonce) for nonce in nonces}
+        self.assertEqual(len(fluxos), len(nonces))
+
+    def test_sementes_distintas_geram_fluxos_distintos(self):
+        semente = bytes(16)
+        self.assertNotEqual(cifra_xor.gerar_fluxo_chave(semente, 0, 64),
+                            cifra_xor.gerar_fluxo_chave(semente + b'\0', 0, 64))
+
+    def test_acesso_aleatorio(self):
+        bloco = cifra_xor.TAMANHO_BLOCO_FLUXO
+        completo = cifra_xor.gerar_fluxo_chave(self.semente, 0, 3 * bloco + 100, b'n')
+        for inicio, fim in ((0, 0), (0, 1), (5, 77), (bloco - 3, bloco + 3), (bloco, 2 * bloco),
+                            (2 * bloco + 1, 3 * bloco + 100)):
+            self.assertEqual(cifra_xor.gerar_fluxo_chave(self.semente, inicio, fim - inicio, b'n'),
+                             completo[inicio:fim])
+
+    def test_decifrar_trecho(self):
+        dados = os.urandom((1 << 20) + 12345)
+        cifrado = cifra_xor.vernam_fluxo_xor(dados, self.semente, nonce=b'msg1')
+        self.assertEqual(cifra_xor.vernam_fluxo_xor(cifrado, self.semente, nonce=b'msg1'), dados)
+        inicio, fim = 700001, 1000003
+        self.assertEqual(cifra_xor.vernam_fluxo_xor(cifrado[inicio:fim], self.semente, inicio, b'msg1'),
+                         dados[inicio:fim])
+
+    def test_parametros_invalidos(self):
+        with self.assertRaises(ValueError):
+            cifra_xor.gerar_fluxo_chave(b'curta', 0, 10)
+        with self.assertRaises(ValueError):
+            cifra_xor.gerar_fluxo_chave(self.semente, 0, 10, bytes(65))
+        with self.assertRaises(ValueError):
+            cifra_xor.gerar_fluxo_chave(self.semente, -1, 10)
+
+if __name__ == '__main__':
+    unittest.main()
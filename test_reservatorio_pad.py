@@ -0,0 +1,44 @@
+import os
+import signal
+import unittest
+
+import carregar_cifras
+
+cifra_xor = carregar_cifras.carregar_vernam_xor()
+
+class TestReservatorioPad(unittest.TestCase):
+
+    def test_chaves_nunca_se_repetem(self):
+        with cifra_xor.ReservatorioPad(tamanho_bloco=1024, blocos_reserva=2, nivel_minimo=1) as reservatorio:
+            chaves = [bytes(cifra_xor.gerar_chave_otp(100, reservatorio)) for _ in range(200)]
+        self.assertEqual(len(set(chaves)), len(chaves))
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "Sem os.fork nesta plataforma")
+    def test_fork_gera_chaves_diferentes(self):
+        with cifra_xor.ReservatorioPad(tamanho_bloco=1024, blocos_reserva=4, nivel_minimo=2) as reservatorio:
+            bytes(cifra_xor.gerar_chave_otp(32, reservatorio))  # Enche o reservatório antes do fork
+            leitura, escrita = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    os.close(leitura)
+                    signal.alarm(10)  # Se o filho travar esperando blocos, o teste falha em vez de travar
+                    chave = bytes(cifra_xor.gerar_chave_otp(32, reservatorio))
+                    # Gasta bem mais que os blocos que existiam no fork: precisa da thread do filho
+                    for _ in range(200):
+                        cifra_xor.gerar_chave_otp(100, reservatorio)
+                    os.write(escrita, chave)
+                finally:
+                    os._exit(0)
+
+            os.close(escrita)
+            chave_pai = bytes(cifra_xor.gerar_chave_otp(32, reservatorio))
+            with os.fdopen(leitura, 'rb') as arquivo:
+                chave_filho = arquivo.read()
+            os.waitpid(pid, 0)
+
+        self.assertEqual(len(chave_filho), 32)
+        self.assertNotEqual(chave_pai, chave_filho)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,15 @@
 #-*- coding: utf-8 -*-#c
 
-import random
+import bisect
+import itertools
+import multiprocessing
+import os
 import string
+from multiprocessing import shared_memory
+
+import instrumentacao
+import motor_mod26
+from gerador_chaves import gerar_chave_alfabeto
 
 # Mapeamento e Configuração
 ALFABETO_MAIUSCULAS = string.ascii_uppercase  # 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
@@ -14,9 +22,8 @@ def gerar_chave_otp(tamanho):
     do tamanho especificado. 
     """
     alfabeto_completo = string.ascii_letters
-    # Utilizamos 'random.SystemRandom()' para uma aleatoriedade mais forte
-    secure_random = random.SystemRandom()
-    return ''.join(secure_random.choice(alfabeto_completo) for _ in range(tamanho))
+    # Utilizamos 'os.urandom' em blocos (via gerador_chaves) para uma aleatoriedade mais forte
+    return gerar_chave_alfabeto(tamanho, alfabeto_completo)
 
 def char_to_num(char):
     """
@@ -40,11 +47,48 @@ def num_to_char(num, is_upper):
     else:
         return ALFABETO_MINUSCULAS[num]
 
+def cifrar_letra(char_texto, char_chave, modo='cifrar'):
+    """
+    Cifra (ou decifra) uma única letra do texto com a letra correspondente da chave,
+    preservando o caso da letra do texto.
+    """
+    valor_texto = char_to_num(char_texto)
+    
+    # A chave é mapeada no mesmo caso da letra do texto para o cálculo ser consistente
+    is_upper = char_texto.isupper()
+    chave_para_calculo = char_chave.upper() if is_upper else char_chave.lower()
+    valor_chave = char_to_num(chave_para_calculo)
+
+    if modo == 'cifrar':
+        # CRIPTOGRAFIA: (Plano + Chave) mod 26
+        valor_resultante = valor_texto + valor_chave
+    elif modo == 'decifrar':
+        # DESCRIPTOGRAFIA: (Cifrado - Chave) mod 26
+        valor_resultante = valor_texto - valor_chave
+    else:
+        raise ValueError("Modo inválido. Use 'cifrar' ou 'decifrar'.")
+
+    # Converte o resultado numérico de volta para letra
+    return num_to_char(valor_resultante, is_upper)
+
 def vernam_cipher(texto, chave, modo='cifrar'):
     """
     Criptografa ou Descriptografa o texto usando a Cifra de Vernam modular.
     (O mesmo código da implementação anterior, garantindo a simetria).
     """
+    medir = instrumentacao.ATIVA
+    if medir:
+        inicio = instrumentacao.relogio()
+
+    if modo in ('cifrar', 'decifrar') and motor_mod26.pode_usar(texto, chave):
+        # Texto e chave ASCII: mesmo resultado, calculado de forma vetorizada (NumPy)
+        saida = motor_mod26.vernam_mod26(texto, chave, 1 if modo == 'cifrar' else -1,
+                                         "ERRO: O número de letras no texto e na chave deve ser idêntico.")
+        if medir:
+            instrumentacao.registrar_tempo('vernam_cipher.numpy', instrumentacao.relogio() - inicio)
+            instrumentacao.contar('vernam_cipher.caracteres', len(texto))
+        return saida
+
     # 1. Filtra apenas as letras para garantir que a chave combine 1:1 com as letras
     letras_texto = [char for char in texto if char.isalpha()]
     letras_chave = [char for char in chave if char.isalpha()]
@@ -54,6 +98,9 @@ def vernam_cipher(texto, chave, modo='cifrar'):
 
     resultado = list(texto)
     indice_chave = 0
+    if medir:
+        fim_filtro = instrumentacao.relogio()
+        instrumentacao.registrar_tempo('vernam_cipher.filtro', fim_filtro - inicio)
 
     for i in range(len(texto)):
         char_texto = texto[i]
@@ -61,28 +108,142 @@ def vernam_cipher(texto, chave, modo='cifrar'):
         if char_texto.isalpha():
             char_chave = letras_chave[indice_chave]
             
-            valor_texto = char_to_num(char_texto)
-            
-            # A chave é mapeada no mesmo caso da letra do texto para o cálculo ser consistente
-            is_upper = char_texto.isupper()
-            chave_para_calculo = char_chave.upper() if is_upper else char_chave.lower()
-            valor_chave = char_to_num(chave_para_calculo)
-
-            if modo == 'cifrar':
-                # CRIPTOGRAFIA: (Plano + Chave) mod 26
-                valor_resultante = valor_texto + valor_chave
-            elif modo == 'decifrar':
-                # DESCRIPTOGRAFIA: (Cifrado - Chave) mod 26
-                valor_resultante = valor_texto - valor_chave
-            else:
-                raise ValueError("Modo inválido. Use 'cifrar' ou 'decifrar'.")
-
-            # Converte o resultado numérico de volta para letra
-            resultado[i] = num_to_char(valor_resultante, is_upper)
+            resultado[i] = cifrar_letra(char_texto, char_chave, modo)
             
             indice_chave += 1
     
-    return "".join(resultado)
+    if not medir:
+        return "".join(resultado)
+
+    fim_laco = instrumentacao.relogio()
+    saida = "".join(resultado)
+    instrumentacao.registrar_tempo('vernam_cipher.laco', fim_laco - fim_filtro)
+    instrumentacao.registrar_tempo('vernam_cipher.juncao', instrumentacao.relogio() - fim_laco)
+    instrumentacao.contar('vernam_cipher.caracteres', len(texto))
+    instrumentacao.contar('vernam_cipher.ignorados', len(texto) - indice_chave)
+    return saida
+
+# --- Modo Paralelo (vários processos) ---
+
+# Textos menores que isso são cifrados em série: abrir processos não compensa.
+TAMANHO_MINIMO_PARALELO = 1 << 20
+
+# Memória compartilhada vista pelos processos trabalhadores (preenchida em 'iniciar_trabalhador')
+memoria_trabalhador = {}
+
+def limites_utf8(dados, partes):
+    """
+    Divide um buffer UTF-8 em até 'partes' pedaços de tamanho parecido,
+    sem cortar nenhum caractere no meio (bytes 10xxxxxx são continuação).
+    """
+    total = len(dados)
+    limites = [0]
+    for parte in range(1, partes):
+        posicao = max(total * parte // partes, limites[-1])
+        while posicao < total and (dados[posicao] & 0xC0) == 0x80:
+            posicao += 1
+        limites.append(posicao)
+    limites.append(total)
+    # Remove pedaços vazios, mantendo o início e o fim
+    return sorted(set(limites))
+
+def iniciar_trabalhador(nome_texto, nome_chave, nome_saida):
+    """Conecta o processo trabalhador aos blocos de memória compartilhada pelo nome."""
+    for papel, nome in (('texto', nome_texto), ('chave', nome_chave), ('saida', nome_saida)):
+        memoria_trabalhador[papel] = shared_memory.SharedMemory(name=nome)
+
+def contar_letras(papel, inicio, fim):
+    """Fase 1: conta as letras de um pedaço do texto ou da chave."""
+    trecho = bytes(memoria_trabalhador[papel].buf[inicio:fim]).decode('utf-8')
+    return sum(map(str.isalpha, trecho))
+
+def cifrar_pedaco(inicio, fim, inicio_chave, fim_chave, pular, quantidade, modo):
+    """
+    Fase 2: cifra um pedaço do texto com as letras da chave a partir do seu deslocamento.
+
+    As letras da chave ficam nos bytes [inicio_chave, fim_chave); as 'pular' primeiras
+    pertencem a pedaços anteriores. O resultado é gravado na memória de saída a partir
+    de 'inicio' (nunca ocupa mais bytes que a entrada, pois toda letra vira ASCII).
+    """
+    trecho = bytes(memoria_trabalhador['texto'].buf[inicio:fim]).decode('utf-8')
+    trecho_chave = bytes(memoria_trabalhador['chave'].buf[inicio_chave:fim_chave]).decode('utf-8')
+    letras_chave = ''.join(filter(str.isalpha, trecho_chave))[pular:pular + quantidade]
+
+    resultado = vernam_cipher(trecho, letras_chave, modo).encode('utf-8')
+    memoria_trabalhador['saida'].buf[inicio:inicio + len(resultado)] = resultado
+    return len(resultado)
+
+def vernam_cipher_paralelo(texto, chave, modo='cifrar', processos=None,
+                           tamanho_minimo=TAMANHO_MINIMO_PARALELO):
+    """
+    Versão multiprocessada de 'vernam_cipher', com resultado idêntico ao da versão serial.
+
+    A chave da posição i depende de quantas letras vêm antes dela, então:
+    1. O texto e a chave vão (em UTF-8) para memória compartilhada e são divididos em pedaços.
+    2. Cada processo conta as letras dos seus pedaços.
+    3. A soma de prefixos exclusiva dessas contagens dá o deslocamento da chave de cada pedaço.
+    4. Cada processo cifra seu pedaço e grava o resultado na memória compartilhada de saída.
+
+    :param processos: Número de processos (padrão: os.cpu_count()).
+    :param tamanho_minimo: Abaixo desse número de caracteres, usa a versão serial.
+    """
+    processos = processos or os.cpu_count() or 1
+    if processos == 1 or len(texto) < tamanho_minimo:
+        return vernam_cipher(texto, chave, modo)
+
+    dados_texto = texto.encode('utf-8')
+    dados_chave = chave.encode('utf-8')
+    memorias = []
+    try:
+        for dados in (dados_texto, dados_chave, dados_texto):
+            memoria = shared_memory.SharedMemory(create=True, size=max(len(dados), 1))
+            memorias.append(memoria)
+        memorias[0].buf[:len(dados_texto)] = dados_texto
+        memorias[1].buf[:len(dados_chave)] = dados_chave
+        nomes = [memoria.name for memoria in memorias]
+
+        # Alguns pedaços por processo equilibram a carga entre eles
+        limites_texto = limites_utf8(dados_texto, processos * 4)
+        limites_chave = limites_utf8(dados_chave, processos * 4)
+        del dados_texto, dados_chave
+
+        with multiprocessing.Pool(processos, initializer=iniciar_trabalhador, initargs=nomes) as pool:
+            # 1. Contagem de letras por pedaço (texto e chave)
+            tarefas = [('texto', a, b) for a, b in zip(limites_texto, limites_texto[1:])]
+            tarefas += [('chave', a, b) for a, b in zip(limites_chave, limites_chave[1:])]
+            contagens = pool.starmap(contar_letras, tarefas)
+            contagens_texto = contagens[:len(limites_texto) - 1]
+            contagens_chave = contagens[len(limites_texto) - 1:]
+
+            if sum(contagens_texto) != sum(contagens_chave):
+                raise ValueError("ERRO: O número de letras no texto e na chave deve ser idêntico.")
+
+            # 2. Soma de prefixos exclusiva: deslocamento da chave no início de cada pedaço
+            deslocamentos_texto = [0] + list(itertools.accumulate(contagens_texto))[:-1]
+            deslocamentos_chave = [0] + list(itertools.accumulate(contagens_chave))
+
+            # 3. Para cada pedaço do texto, localiza os pedaços da chave que contêm suas letras
+            tarefas = []
+            for parte, (inicio, fim) in enumerate(zip(limites_texto, limites_texto[1:])):
+                deslocamento = deslocamentos_texto[parte]
+                quantidade = contagens_texto[parte]
+                primeiro = bisect.bisect_right(deslocamentos_chave, deslocamento) - 1
+                ultimo = bisect.bisect_left(deslocamentos_chave, deslocamento + quantidade)
+                primeiro = min(primeiro, len(limites_chave) - 2)
+                ultimo = max(ultimo, primeiro + 1)
+                tarefas.append((inicio, fim, limites_chave[primeiro], limites_chave[ultimo],
+                                deslocamento - deslocamentos_chave[primeiro], quantidade, modo))
+
+            # 4. Cifragem dos pedaços, cada um gravando direto na memória de saída
+            tamanhos = pool.starmap(cifrar_pedaco, tarefas)
+
+        saida = memorias[2].buf
+        return b''.join(bytes(saida[inicio:inicio + tamanho])
+                        for inicio, tamanho in zip(limites_texto, tamanhos)).decode('utf-8')
+    finally:
+        for memoria in memorias:
+            memoria.close()
+            memoria.unlink()
 
 # --- Função de Interação do Usuário (Main) ---
 